@@ -1,7 +1,9 @@
 import _ast
+import sys
 from _ast import *
 
-from rope.base import fscommands
+from rope.base import fscommands, utils
+from rope.base.utils import pycompat
 
 try:
     unicode
@@ -10,13 +12,24 @@ except NameError:
 
 
 def parse(source, filename='<string>'):
-    # NOTE: the raw string should be given to `compile` function
-    if isinstance(source, unicode):
+    # NOTE: Python 2 does not accept encoding declarations in unicode
+    # sources; the raw string should be given to `compile` function.
+    # Python 3 compiles decoded sources as they are.
+    if isinstance(source, unicode) and pycompat.PY2:
         source = fscommands.unicode_to_file_data(source)
-    if b'\r' in source:
-        source = source.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
-    if not source.endswith(b'\n'):
-        source += b'\n'
+    if isinstance(source, unicode):
+        # like for undecoded sources, the byte order mark is skipped
+        if source.startswith('\ufeff'):
+            source = source[1:]
+        cr, lf = '\r', '\n'
+    else:
+        cr, lf = b'\r', b'\n'
+    # the common case of sources without CRs is not copied
+    if cr in source:
+        source = source.replace(cr + lf, lf).replace(cr, lf)
+    # `compile` needs a trailing newline before python 2.7
+    if sys.version_info < (2, 7) and not source.endswith(lf):
+        source += lf
     try:
         return compile(source, filename, 'exec', _ast.PyCF_ONLY_AST)
     except (TypeError, ValueError) as e:
@@ -27,6 +40,37 @@ def parse(source, filename='<string>'):
         raise error
 
 
+def parse_shared(source, filename='<string>'):
+    """Parse `source` sharing the tree with other users of the same source
+
+    Each source is parsed only once while it stays in a small cache.
+    Undecoded sources are decoded first, so they share the trees of
+    their decoded sources.  The returned tree is shared and should be
+    treated as read-only; the only change allowed is adding fields
+    derived from the same source, as
+    `rope.refactor.patchedast.patch_ast()` does.
+
+    """
+    if not isinstance(source, unicode):
+        try:
+            source = fscommands.file_data_to_unicode(source, strict=True)
+        except (UnicodeError, LookupError):
+            # `compile` reports the syntax error
+            pass
+    try:
+        # the type is compared first; python 2 warns when comparing
+        # non-ascii byte strings with unicode strings
+        return _parse_shared(isinstance(source, unicode), source)
+    except SyntaxError as e:
+        e.filename = filename
+        raise
+
+
+@utils.cached(12)
+def _parse_shared(is_unicode, source):
+    return parse(source)
+
+
 def walk(node, walker):
     """Walk the syntax tree"""
     method_name = '_' + node.__class__.__name__
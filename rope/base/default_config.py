@@ -49,6 +49,14 @@ def set_prefs(prefs):
     # analysis" is turned off.  This makes them much faster.
     prefs['perform_doa'] = True
 
+    # How DOA collects information.  'trace' uses `sys.settrace()`;
+    # 'profile' uses `sys.setprofile()` which is not called for every
+    # executed line and makes running modules much faster.
+    prefs['doa_tracer'] = 'trace'
+    # If more than 1, DOA records only one of every `doa_sampling`
+    # calls of each function.
+    prefs['doa_sampling'] = 1
+
     # Rope can check the validity of its object DB when running.
     prefs['validate_objectdb'] = True
 
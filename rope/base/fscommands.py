@@ -206,14 +206,19 @@ def unicode_to_file_data(contents, encoding=None):
         return contents.encode('utf-8')
 
 
-def file_data_to_unicode(data, encoding=None):
-    result = _decode_data(data, encoding)
+def file_data_to_unicode(data, encoding=None, strict=False):
+    """Decode file data using its declared encoding
+
+    If the data cannot be decoded, it is decoded as latin1 unless
+    `strict` is `True`; then `UnicodeError` or `LookupError` is raised.
+    """
+    result = _decode_data(data, encoding, strict)
     if '\r' in result:
         result = result.replace('\r\n', '\n').replace('\r', '\n')
     return result
 
 
-def _decode_data(data, encoding):
+def _decode_data(data, encoding, strict=False):
     if isinstance(data, unicode):
         return data
     if encoding is None:
@@ -227,6 +232,8 @@ def _decode_data(data, encoding):
     try:
         return data.decode(encoding)
     except (UnicodeError, LookupError):
+        if strict:
+            raise
         # fallback to latin1: it should never fail
         return data.decode('latin1')
 
@@ -248,17 +255,19 @@ def read_file_coding(path):
 def read_str_coding(source):
     if type(source) == bytes:
         newline = b'\n'
+        coding = b'coding'
     else:
         newline = '\n'
-    #try:
-    #    source = source.decode("utf-8")
-    #except AttributeError:
-    #    pass
+        coding = 'coding'
     try:
         first = source.index(newline) + 1
         second = source.index(newline, first) + 1
     except ValueError:
         second = len(source)
+    # most sources have no encoding declarations; avoid copying and
+    # encoding the first two lines for them
+    if source.find(coding, 0, second) == -1:
+        return None
     return _find_coding(source[:second])
 
 
@@ -74,12 +74,20 @@ def analyze_modules(project, task_handle=taskhandle.NullTaskHandle()):
 
     Note that this might be really time consuming.
     """
-    resources = project.get_python_files()
-    job_set = task_handle.create_jobset('Analyzing Modules', len(resources))
-    for resource in resources:
-        job_set.started_job(resource.path)
-        analyze_module(project, resource)
-        job_set.finished_job()
+    project.pycore.analyze_modules(project.get_python_files(),
+                                   task_handle=task_handle)
+
+
+def analyze_stale_scopes(project, task_handle=taskhandle.NullTaskHandle()):
+    """Analyze the scopes of python files that have become stale
+
+    That is the scopes whose code, or the code of the functions they
+    call, has changed since they were last analyzed.  Unlike
+    `analyze_modules()`, this can be called after each batch of
+    changes.
+    """
+    project.pycore.analyze_stale_scopes(project.get_python_files(),
+                                        task_handle=task_handle)
 
 
 def get_string_module(project, code, resource=None, force_errors=False):
@@ -120,3 +128,44 @@ def modname(resource):
         source_folder = source_folder.parent
 
     return module_name
+
+
+def get_file_stamp(resource):
+    """Return what tells whether the contents of `resource` changed
+
+    The stamp is a ``(real path, modification time, size)`` tuple;
+    ``None`` is returned if the file cannot be accessed.
+    """
+    try:
+        stat = os.stat(resource.real_path)
+    except OSError:
+        return None
+    return (resource.real_path, stat.st_mtime, stat.st_size)
+
+
+class DataFilesCache(object):
+    """Dicts kept in the project's data files
+
+    The dicts are read from the data files named `names` when first
+    used and are written back when the project's data files are
+    written, if they were read.
+    """
+
+    def __init__(self, project, names):
+        self.project = project
+        self.names = names
+        self._data = None
+        project.data_files.add_write_hook(self._write)
+
+    def get_data(self):
+        """Return the list of the dicts in the order of `names`"""
+        if self._data is None:
+            data_files = self.project.data_files
+            self._data = [data_files.read_data(name) or {}
+                          for name in self.names]
+        return self._data
+
+    def _write(self):
+        if self._data is not None:
+            for name, data in zip(self.names, self._data):
+                self.project.data_files.write_data(name, data)
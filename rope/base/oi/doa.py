@@ -7,7 +7,9 @@ except ImportError:
     import pickle
 import marshal
 import os
+import shutil
 import socket
+import struct
 import subprocess
 import sys
 import tempfile
@@ -36,14 +38,33 @@ except ImportError:
     compare_digest = _compat_compare_digest
 
 
+# Sizes of the length and the digest that prefix the messages of
+# `_SocketReceiver`
+_SIZE_LENGTH = struct.calcsize('>I')
+_DIGEST_LENGTH = hashlib.sha256().digest_size
+# The largest message `_SocketReceiver` accepts; it should match
+# `_SocketSender.max_message_size` in `rope.base.oi.runmod`
+_MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
 class PythonFileRunner(object):
     """A class for running python project files"""
 
     def __init__(self, pycore, file_, args=None, stdin=None,
-                 stdout=None, analyze_data=None):
+                 stdout=None, analyze_data=None, tracer='trace', sampling=1):
+        """Construct a runner
+
+        `tracer` can be ``'trace'`` or ``'profile'``; see the
+        ``doa_tracer`` project config.  If `sampling` is more than
+        one, only one of every `sampling` calls of each function is
+        analyzed.
+
+        """
         self.pycore = pycore
         self.file = file_
         self.analyze_data = analyze_data
+        self.tracer = tracer
+        self.sampling = sampling
         self.observers = []
         self.args = args
         self.stdin = stdin
@@ -63,16 +84,22 @@ class PythonFileRunner(object):
         send_info = '-'
         if self.receiver:
             send_info = self.receiver.get_send_info()
-        args = [sys.executable, runmod_path, send_info,
+        tracer_info = '%s:%d' % (self.tracer, self.sampling)
+        args = [sys.executable, runmod_path, send_info, tracer_info,
                 self.pycore.project.address, self.file.real_path]
         if self.analyze_data is None:
-            del args[1:4]
+            del args[1:5]
         if self.args is not None:
             args.extend(self.args)
-        self.process = subprocess.Popen(
-            executable=sys.executable, args=args, env=env,
-            cwd=os.path.split(file_path)[0], stdin=self.stdin,
-            stdout=self.stdout, stderr=self.stdout, close_fds=os.name != 'nt')
+        try:
+            self.process = subprocess.Popen(
+                executable=sys.executable, args=args, env=env,
+                cwd=os.path.split(file_path)[0], stdin=self.stdin,
+                stdout=self.stdout, stderr=self.stdout,
+                close_fds=os.name != 'nt')
+        except OSError:
+            self._close_receiver()
+            raise
 
     def _init_data_receiving(self):
         if self.analyze_data is None:
@@ -80,10 +107,10 @@ class PythonFileRunner(object):
         # Disabling FIFO data transfer due to blocking when running
         # unittests in the GUI.
         # XXX: Handle FIFO data transfer for `rope.ui.testview`
-        if True or os.name == 'nt':
-            self.receiver = _SocketReceiver()
+        if hasattr(socket, 'AF_UNIX'):
+            self.receiver = _UnixSocketReceiver()
         else:
-            self.receiver = _FIFOReceiver()
+            self.receiver = _SocketReceiver()
         self.receiving_thread = threading.Thread(
             target=self._receive_information)
         self.receiving_thread.setDaemon(True)
@@ -103,9 +130,11 @@ class PythonFileRunner(object):
         self.process.wait()
         if self.analyze_data:
             self.receiving_thread.join()
+        self._close_receiver()
 
     def kill_process(self):
         """Stop the process"""
+        self._close_receiver()
         if self.process.poll() is not None:
             return
         try:
@@ -120,6 +149,10 @@ class PythonFileRunner(object):
         except OSError:
             pass
 
+    def _close_receiver(self):
+        if self.receiver is not None:
+            self.receiver.close()
+
     def add_finishing_observer(self, observer):
         """Notify this observer when execution finishes"""
         self.observers.append(observer)
@@ -133,22 +166,28 @@ class _MessageReceiver(object):
     def get_send_info(self):
         pass
 
+    def close(self):
+        """Release the resources of the receiver
+
+        It is called when the process finishes or is killed, even if
+        `receive_data()` was never started.
+        """
+
 
 class _SocketReceiver(_MessageReceiver):
 
     def __init__(self):
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.data_port = 3037
         self.key = os.urandom(32)
-
-        while self.data_port < 4000:
-            try:
-                self.server_socket.bind(('localhost', self.data_port))
-                break
-            except socket.error:
-                self.data_port += 1
+        self.server_socket = self._create_server_socket()
         self.server_socket.listen(1)
 
+    def _create_server_socket(self):
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Letting the OS choose a free port
+        server_socket.bind(('localhost', 0))
+        self.data_port = server_socket.getsockname()[1]
+        return server_socket
+
     def get_send_info(self):
         return '%d:%s' % (self.data_port,
                           base64.b64encode(self.key).decode('utf-8'))
@@ -157,43 +196,76 @@ class _SocketReceiver(_MessageReceiver):
         conn, addr = self.server_socket.accept()
         self.server_socket.close()
         my_file = conn.makefile('rb')
+        header_size = _SIZE_LENGTH + _DIGEST_LENGTH
         while True:
             # Received messages must meet the following criteria:
-            # 1. Must be contained on a single line.
-            # 2. Must be prefixed with a base64 encoded sha256 message digest 
-            #    of the base64 encoded pickle data.
+            # 1. Must start with the length of the pickled data as a
+            #    4-byte big-endian unsigned integer; the length must not
+            #    exceed `_MAX_MESSAGE_SIZE`.
+            # 2. The length must be followed by the sha256 message digest
+            #    of the pickled data and the pickled data itself.
             # 3. Message digest must be computed using the correct key.
             #
             # Any messages received that do not meet these criteria will never
             # be unpickled and will be dropped silently.
-            try:
-                buf = my_file.readline()
-                if len(buf) == 0:
-                    break
-
-                try:
-                    digest_end = buf.index(b':')
-                    buf_digest = base64.b64decode(buf[:digest_end])
-                    buf_data = buf[digest_end + 1:-1]
-                    decoded_buf_data = base64.b64decode(buf_data)
-                except:
-                    # Corrupted data; the payload cannot be trusted and just has
-                    # to be dropped. See CVE-2014-3539.
-                    continue
-
-                digest = hmac.new(self.key, buf_data, hashlib.sha256).digest()
-                if not compare_digest(buf_digest, digest):
-                    # Signature mismatch; the payload cannot be trusted and just
-                    # has to be dropped. See CVE-2014-3539.
-                    continue
-
-                yield pickle.loads(decoded_buf_data)
-            except EOFError:
+            header = my_file.read(header_size)
+            if len(header) < header_size:
                 break
+            size = struct.unpack('>I', header[:_SIZE_LENGTH])[0]
+            if size > _MAX_MESSAGE_SIZE:
+                # The length is not authenticated yet; reading it could
+                # allocate gigabytes.
+                break
+            buf_digest = header[_SIZE_LENGTH:]
+            buf_data = my_file.read(size)
+            if len(buf_data) < size:
+                # Truncated data; the payload cannot be trusted and just has
+                # to be dropped. See CVE-2014-3539.
+                break
+
+            digest = hmac.new(self.key, buf_data, hashlib.sha256).digest()
+            if not compare_digest(buf_digest, digest):
+                # Signature mismatch; the payload cannot be trusted and just
+                # has to be dropped. See CVE-2014-3539.
+                continue
+
+            for data in pickle.loads(buf_data):
+                yield data
         my_file.close()
         conn.close()
 
 
+class _UnixSocketReceiver(_SocketReceiver):
+    """Receives data through a unix domain socket
+
+    The socket is created in a new temporary folder that only the
+    current user can access.  Messages are still authenticated like
+    `_SocketReceiver`.
+
+    """
+
+    def _create_server_socket(self):
+        self.folder = tempfile.mkdtemp(prefix='rope')
+        self.socket_path = os.path.join(self.folder, 'doa')
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server_socket.bind(self.socket_path)
+        return server_socket
+
+    def get_send_info(self):
+        return 'unix:%s:%s' % (self.socket_path,
+                               base64.b64encode(self.key).decode('utf-8'))
+
+    def receive_data(self):
+        try:
+            for data in super(_UnixSocketReceiver, self).receive_data():
+                yield data
+        finally:
+            self.close()
+
+    def close(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
 class _FIFOReceiver(_MessageReceiver):
 
     def __init__(self):
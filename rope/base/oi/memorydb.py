@@ -103,6 +103,8 @@ class ScopeInfo(objectdb.ScopeInfo):
     def __init__(self):
         self.call_info = {}
         self.per_name = {}
+        self.fingerprint = None
+        self.callees = {}
 
     def get_per_name(self, name):
         return self.per_name.get(name, None)
@@ -120,8 +122,21 @@ class ScopeInfo(objectdb.ScopeInfo):
     def add_call(self, parameters, returned):
         self.call_info[parameters] = returned
 
+    def get_fingerprint(self):
+        return self.fingerprint
+
+    def get_callees(self):
+        return self.callees
+
+    def set_fingerprint(self, fingerprint, callees):
+        self.fingerprint = fingerprint
+        self.callees = callees
+
     def __getstate__(self):
-        return (self.call_info, self.per_name)
+        return (self.call_info, self.per_name, self.fingerprint, self.callees)
 
     def __setstate__(self, data):
-        self.call_info, self.per_name = data
+        # objectdbs written by older versions lack fingerprints
+        if len(data) == 2:
+            data = data + (None, {})
+        self.call_info, self.per_name, self.fingerprint, self.callees = data
@@ -12,11 +12,13 @@ class ObjectDB(object):
         self.validation = validation
         self.observers = []
         self.files = db.files
+        self._summaries = {}
 
     def validate_files(self):
         for file in list(self.files):
             if not self.validation.is_file_valid(file):
                 del self.files[file]
+                self._forget_summaries(file)
                 self._file_removed(file)
 
     def validate_file(self, file):
@@ -25,11 +27,14 @@ class ObjectDB(object):
         for key in list(self.files[file]):
             if not self.validation.is_scope_valid(file, key):
                 del self.files[file][key]
+                self._summaries.pop((file, key), None)
 
     def file_moved(self, file, newfile):
         if file not in self.files:
             return
         self.files.rename(file, newfile)
+        self._forget_summaries(file)
+        self._forget_summaries(newfile)
         self._file_removed(file)
         self._file_added(newfile)
 
@@ -53,10 +58,62 @@ class ObjectDB(object):
         return scope_info.get_call_infos()
 
     def add_callinfo(self, path, key, args, returned):
+        self.add_callinfos(path, key, [(args, returned)])
+
+    def add_callinfos(self, path, key, callinfos):
+        """Add a list of ``(args, returned)`` tuples to a scope"""
         scope_info = self._get_scope_info(path, key, readonly=False)
-        old_returned = scope_info.get_returned(args)
-        if self.validation.is_more_valid(returned, old_returned):
-            scope_info.add_call(args, returned)
+        summary = self._summaries.get((path, key))
+        for args, returned in callinfos:
+            old_returned = scope_info.get_returned(args)
+            if self.validation.is_more_valid(returned, old_returned):
+                scope_info.add_call(args, returned)
+                if summary is not None:
+                    summary.add_call(args, returned)
+
+    def get_summary(self, path, key):
+        """Return the `ScopeSummary` of the call infos of a scope
+
+        Summaries are created when first asked for and are updated
+        when call infos are added.
+
+        """
+        if (path, key) not in self._summaries:
+            summary = ScopeSummary(self.validation)
+            for call_info in self.get_callinfos(path, key):
+                summary.add_call(call_info.get_parameters(),
+                                 call_info.get_returned())
+            self._summaries[(path, key)] = summary
+        return self._summaries[(path, key)]
+
+    def _forget_summaries(self, path):
+        for scope in list(self._summaries):
+            if scope[0] == path:
+                del self._summaries[scope]
+
+    def get_fingerprint(self, path, key):
+        """Return the fingerprint and the callees of an analyzed scope
+
+        The callees map the ``(path, key)`` of the called functions to
+        their fingerprints when the scope was analyzed.
+
+        """
+        scope_info = self._get_scope_info(path, key, readonly=True)
+        return scope_info.get_fingerprint(), scope_info.get_callees()
+
+    def set_fingerprint(self, path, key, fingerprint, callees):
+        """Store the fingerprint and the callees of a scope
+
+        They are stored only for scopes with call information; `False`
+        is returned for other scopes, which are not added to the
+        objectdb only for holding fingerprints.
+
+        """
+        scope_info = self._get_scope_info(path, key, readonly=True)
+        for call_info in scope_info.get_call_infos():
+            scope_info.set_fingerprint(fingerprint, callees)
+            return True
+        return False
 
     def add_pername(self, path, key, name, value):
         scope_info = self._get_scope_info(path, key, readonly=False)
@@ -123,6 +180,16 @@ class _NullScopeInfo(object):
         if self.error_on_write:
             raise NotImplementedError()
 
+    def get_fingerprint(self):
+        pass
+
+    def get_callees(self):
+        return {}
+
+    def set_fingerprint(self, fingerprint, callees):
+        if self.error_on_write:
+            raise NotImplementedError()
+
 
 class FileInfo(MutableMapping):
 
@@ -156,6 +223,33 @@ class ScopeInfo(object):
     def add_call(self, parameters, returned):
         pass
 
+    def get_fingerprint(self):
+        pass
+
+    def get_callees(self):
+        pass
+
+    def set_fingerprint(self, fingerprint, callees):
+        pass
+
+
+class ScopeSummary(object):
+    """The most valid returned and parameter objects of a scope's calls"""
+
+    def __init__(self, validation):
+        self.validation = validation
+        self.returned = None
+        self.parameters = []
+
+    def add_call(self, args, returned):
+        if self.validation.is_more_valid(returned, self.returned):
+            self.returned = returned
+        for index, arg in enumerate(args):
+            if index == len(self.parameters):
+                self.parameters.append(arg)
+            elif self.validation.is_more_valid(arg, self.parameters[index]):
+                self.parameters[index] = arg
+
 
 class CallInfo(object):
 
@@ -17,6 +17,8 @@ class ObjectInfoManager(object):
         self.to_textual = transform.PyObjectToTextual(project)
         self.to_pyobject = transform.TextualToPyObject(project)
         self.doi_to_pyobject = transform.DOITextualToPyObject(project)
+        # the fingerprints the objectdb does not store
+        self._fingerprints = {}
         self._init_objectdb()
         if project.prefs.get('validate_objectdb', False):
             self._init_validation()
@@ -51,6 +53,12 @@ class ObjectInfoManager(object):
         self.objectdb.add_file_list_observer(_FileListObserver(self))
         self.project.add_observer(self.observer)
 
+    def module_changed(self, resource):
+        """Forget cached information that depends on `resource` module"""
+        path = self.to_textual.resource_to_path(resource)
+        self.to_pyobject.forget_cache(path)
+        self.doi_to_pyobject.forget_cache(path)
+
     def _resource_changed(self, resource):
         try:
             self.objectdb.validate_file(
@@ -73,15 +81,9 @@ class ObjectInfoManager(object):
         path, key = self._get_scope(pyobject)
         if path is None:
             return None
-        for call_info in self.objectdb.get_callinfos(path, key):
-            returned = call_info.get_returned()
-            if returned and returned[0] not in ('unknown', 'none'):
-                result = returned
-                break
-            if result is None:
-                result = returned
-        if result is not None:
-            return self.to_pyobject(result)
+        returned = self.objectdb.get_summary(path, key).returned
+        if returned is not None:
+            return self.to_pyobject(returned)
 
     def get_exact_returned(self, pyobject, args):
         path, key = self._get_scope(pyobject)
@@ -103,21 +105,13 @@ class ObjectInfoManager(object):
         if path is None:
             return None
         arg_count = len(pyobject.get_param_names(special_args=False))
-        unknowns = arg_count
-        parameters = [None] * arg_count
-        for call_info in self.objectdb.get_callinfos(path, key):
-            args = call_info.get_parameters()
-            for index, arg in enumerate(args[:arg_count]):
-                old = parameters[index]
-                if self.validation.is_more_valid(arg, old):
-                    parameters[index] = arg
-                    if self.validation.is_value_valid(arg):
-                        unknowns -= 1
-            if unknowns == 0:
-                break
-        if unknowns < arg_count:
-            return [self.to_pyobject(parameter)
-                    for parameter in parameters]
+        parameters = self.objectdb.get_summary(path, key).parameters
+        parameters = parameters[:arg_count]
+        parameters += [None] * (arg_count - len(parameters))
+        for parameter in parameters:
+            if self.validation.is_value_valid(parameter):
+                return [self.to_pyobject(parameter)
+                        for parameter in parameters]
 
     def get_passed_objects(self, pyfunction, parameter_index):
         path, key = self._get_scope(pyfunction)
@@ -133,15 +127,40 @@ class ObjectInfoManager(object):
         return result
 
     def doa_data_received(self, data):
-        def doi_to_normal(textual):
-            pyobject = self.doi_to_pyobject(textual)
-            return self.to_textual(pyobject)
-        function = doi_to_normal(data[0])
-        args = tuple([doi_to_normal(textual) for textual in data[1]])
-        returned = doi_to_normal(data[2])
+        function = self._doi_to_normal(data[0])
+        args = tuple([self._doi_to_normal(textual) for textual in data[1]])
+        returned = self._doi_to_normal(data[2])
         if function[0] == 'defined' and len(function) == 3:
             self._save_data(function, args, returned)
 
+    def doa_bulk_data_received(self, data_list):
+        """Like calling `doa_data_received()` for each item of `data_list`
+
+        Each distinct textual is converted only once and the
+        information of each scope is added to the objectdb at once.
+
+        """
+        normals = {}
+
+        def doi_to_normal(textual):
+            if textual not in normals:
+                normals[textual] = self._doi_to_normal(textual)
+            return normals[textual]
+        scopes = {}
+        for data in data_list:
+            function = doi_to_normal(data[0])
+            if function[0] == 'defined' and len(function) == 3:
+                args = tuple([doi_to_normal(textual) for textual in data[1]])
+                returned = doi_to_normal(data[2])
+                scopes.setdefault((function[1], function[2]), []).append(
+                    (args, returned))
+        for (path, key), callinfos in scopes.items():
+            self.objectdb.add_callinfos(path, key, callinfos)
+
+    def _doi_to_normal(self, textual):
+        pyobject = self.doi_to_pyobject(textual)
+        return self.to_textual(pyobject)
+
     def function_called(self, pyfunction, params, returned=None):
         function_text = self.to_textual(pyfunction)
         params_text = tuple([self.to_textual(param)
@@ -163,6 +182,63 @@ class ObjectInfoManager(object):
             if result is not None:
                 return self.to_pyobject(result)
 
+    def scope_analyzed(self, pydefined, fingerprint, callees):
+        """Record the fingerprints of an analyzed scope and its callees
+
+        `callees` maps the functions called in `pydefined` to their
+        fingerprints.
+
+        """
+        path, key = self._get_scope(pydefined)
+        if path is None:
+            return
+        callee_fingerprints = {}
+        for pyfunction, callee_fingerprint in callees.items():
+            callee = self._get_scope(pyfunction)
+            if callee[0] is not None:
+                callee_fingerprints[callee] = callee_fingerprint
+        self._fingerprints[(path, key)] = (fingerprint, callee_fingerprints)
+        # the callees might have call information now
+        for scope in [(path, key)] + list(callee_fingerprints):
+            if scope in self._fingerprints:
+                scope_fingerprint, scope_callees = self._fingerprints[scope]
+                if self.objectdb.set_fingerprint(
+                        scope[0], scope[1], scope_fingerprint, scope_callees):
+                    del self._fingerprints[scope]
+
+    def get_stale_scopes(self, fingerprints):
+        """Return the scopes that should be analyzed again
+
+        `fingerprints` maps pydefineds to the fingerprints of their
+        current code.  A scope is stale if it has not been analyzed,
+        if its fingerprint has changed or if the fingerprint of one of
+        the functions it called, when among `fingerprints`, has changed
+        since it was last analyzed.  The fingerprints of scopes without
+        call information are not stored in the objectdb; these scopes
+        are stale again in new sessions.
+
+        """
+        current = {}
+        for pydefined, fingerprint in fingerprints.items():
+            path, key = self._get_scope(pydefined)
+            if path is not None:
+                current[(path, key)] = (pydefined, fingerprint)
+        result = []
+        for scope, (pydefined, fingerprint) in current.items():
+            if scope in self._fingerprints:
+                old_fingerprint, callees = self._fingerprints[scope]
+            else:
+                old_fingerprint, callees = \
+                    self.objectdb.get_fingerprint(*scope)
+            stale = old_fingerprint != fingerprint
+            for callee, callee_fingerprint in callees.items():
+                if callee in current and \
+                   current[callee][1] != callee_fingerprint:
+                    stale = True
+            if stale:
+                result.append(pydefined)
+        return result
+
     def _save_data(self, function, args, returned=('unknown',)):
         self.objectdb.add_callinfo(function[1], function[2], args, returned)
 
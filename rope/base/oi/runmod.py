@@ -1,7 +1,9 @@
 def __rope_start_everything():
+    import atexit
     import os
     import sys
     import socket
+    import struct
     try:
         import cPickle as pickle
     except ImportError:
@@ -10,6 +12,7 @@ def __rope_start_everything():
     import inspect
     import types
     import threading
+    import time
     import rope.base.utils.pycompat as pycompat
     import base64
     import hashlib
@@ -22,21 +25,65 @@ def __rope_start_everything():
 
     class _SocketSender(_MessageSender):
 
-        def __init__(self, port, key):
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect(('127.0.0.1', port))
+        # Records are sent in batches of `batch_size` records or when
+        # `flush_interval` seconds have passed since the last batch, so
+        # that few are lost if the process is killed.  Messages larger
+        # than `max_message_size` are split; the receiver drops the
+        # connection for larger messages (see `rope.base.oi.doa`).
+        batch_size = 256
+        flush_interval = 0.2
+        max_message_size = 64 * 1024 * 1024
+
+        def __init__(self, address, key):
+            if isinstance(address, int):
+                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                s.connect(('127.0.0.1', address))
+            else:
+                s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                s.connect(address)
             self.my_file = s.makefile('wb')
             self.key = base64.b64decode(key)
+            self.batch = []
+            self.sent_time = time.time()
+            self.lock = threading.Lock()
+            atexit.register(self.close)
 
         def send_data(self, data):
-            if not self.my_file.closed:
-                pickled_data = base64.b64encode(
-                    pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
-                dgst = hmac.new(self.key, pickled_data, hashlib.sha256).digest()
-                self.my_file.write(base64.b64encode(dgst) + b':' +
-                                   pickled_data + b'\n')
+            with self.lock:
+                if not self.my_file.closed:
+                    self.batch.append(data)
+                    if len(self.batch) >= self.batch_size or \
+                       time.time() - self.sent_time >= self.flush_interval:
+                        self._send_batch()
+
+        def _send_batch(self):
+            # `self.lock` should be held by the caller
+            batch, self.batch = self.batch, []
+            self.sent_time = time.time()
+            if batch:
+                self._send_records(batch)
+                self.my_file.flush()
+
+        def _send_records(self, records):
+            # Each message holds a pickled list of records; it is prefixed
+            # with its length and its sha256 digest.
+            pickled_data = pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+            if len(pickled_data) > self.max_message_size:
+                # a single record that is too large is dropped
+                if len(records) > 1:
+                    middle = len(records) // 2
+                    self._send_records(records[:middle])
+                    self._send_records(records[middle:])
+                return
+            dgst = hmac.new(self.key, pickled_data, hashlib.sha256).digest()
+            self.my_file.write(struct.pack('>I', len(pickled_data)) +
+                               dgst + pickled_data)
+
         def close(self):
-            self.my_file.close()
+            with self.lock:
+                if not self.my_file.closed:
+                    self._send_batch()
+                    self.my_file.close()
 
     class _FileSender(_MessageSender):
 
@@ -63,28 +110,53 @@ def __rope_start_everything():
 
     class _FunctionCallDataSender(object):
 
-        def __init__(self, send_info, project_root):
+        def __init__(self, send_info, project_root, tracer_info):
             self.project_root = project_root
-            if send_info[0].isdigit():
+            if send_info.startswith('unix:'):
+                path, key = send_info[len('unix:'):].rsplit(':', 1)
+                self.sender = _SocketSender(path, key)
+            elif send_info[0].isdigit():
                 port, key = send_info.split(':', 1)
                 self.sender = _SocketSender(int(port), key)
             else:
                 self.sender = _FileSender(send_info)
+            tracer, sampling = tracer_info.split(':')
+            self.sampling = int(sampling)
+            self.calls = {}
+            self.sent = set()
+            self.inside_project = {}
 
-            def global_trace(frame, event, arg):
-                # HACK: Ignoring out->in calls
-                # This might lose some information
-                if self._is_an_interesting_call(frame):
-                    return self.on_function_call
-            sys.settrace(global_trace)
-            threading.settrace(global_trace)
+            if tracer == 'profile':
+                # Profile functions are not called for line events
+                def profile(frame, event, arg):
+                    if event == 'return' and \
+                       self._is_an_interesting_call(frame):
+                        self._on_function_return(frame, arg)
+                sys.setprofile(profile)
+                threading.setprofile(profile)
+            else:
+                def global_trace(frame, event, arg):
+                    # HACK: Ignoring out->in calls
+                    # This might lose some information
+                    if self._is_an_interesting_call(frame):
+                        return self.on_function_call
+                sys.settrace(global_trace)
+                threading.settrace(global_trace)
 
         def on_function_call(self, frame, event, arg):
-            if event != 'return':
-                return
+            if event == 'return':
+                self._on_function_return(frame, arg)
+            return self.on_function_call
+
+        def _on_function_return(self, frame, arg):
+            code = frame.f_code
+            if self.sampling > 1:
+                count = self.calls.get(code, 0)
+                self.calls[code] = count + 1
+                if count % self.sampling != 0:
+                    return
             args = []
             returned = ('unknown',)
-            code = frame.f_code
             for argname in code.co_varnames[:code.co_argcount]:
                 try:
                     argvalue = self._object_to_persisted_form(
@@ -99,10 +171,12 @@ def __rope_start_everything():
             try:
                 data = (self._object_to_persisted_form(frame.f_code),
                         tuple(args), returned)
-                self.sender.send_data(data)
+                # Sending the same information again is useless
+                if data not in self.sent:
+                    self.sent.add(data)
+                    self.sender.send_data(data)
             except (TypeError):
                 pass
-            return self.on_function_call
 
         def _is_an_interesting_call(self, frame):
             #if frame.f_code.co_name in ['?', '<module>']:
@@ -116,9 +190,13 @@ def __rope_start_everything():
             return True
 
         def _is_code_inside_project(self, code):
-            source = self._path(code.co_filename)
-            return source is not None and os.path.exists(source) and \
-                _realpath(source).startswith(self.project_root)
+            filename = code.co_filename
+            if filename not in self.inside_project:
+                source = self._path(filename)
+                self.inside_project[filename] = \
+                    source is not None and os.path.exists(source) and \
+                    _realpath(source).startswith(self.project_root)
+            return self.inside_project[filename]
 
         @_cached
         def _get_persisted_code(self, object_):
@@ -206,24 +284,31 @@ def __rope_start_everything():
         def close(self):
             self.sender.close()
             sys.settrace(None)
+            sys.setprofile(None)
 
     def _realpath(path):
         return os.path.realpath(os.path.abspath(os.path.expanduser(path)))
 
     send_info = sys.argv[1]
-    project_root = sys.argv[2]
-    file_to_run = sys.argv[3]
+    tracer_info = sys.argv[2]
+    project_root = sys.argv[3]
+    file_to_run = sys.argv[4]
     run_globals = globals()
     run_globals.update({'__name__': '__main__',
                         '__builtins__': __builtins__,
                         '__file__': file_to_run})
 
     if send_info != '-':
-        data_sender = _FunctionCallDataSender(send_info, project_root)
-    del sys.argv[1:4]
-    pycompat.execfile(file_to_run, run_globals)
-    if send_info != '-':
-        data_sender.close()
+        data_sender = _FunctionCallDataSender(send_info, project_root,
+                                              tracer_info)
+    del sys.argv[1:5]
+    try:
+        pycompat.execfile(file_to_run, run_globals)
+    finally:
+        # the buffered data should be sent even if the program
+        # calls `sys.exit()` or raises an exception
+        if send_info != '-':
+            data_sender.close()
 
 
 if __name__ == '__main__':
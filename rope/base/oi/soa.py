@@ -1,7 +1,10 @@
+import hashlib
+
 import rope.base.ast
 import rope.base.oi.soi
 import rope.base.pynames
-from rope.base import pyobjects, evaluate, astutils, arguments
+from rope.base import pyobjects, evaluate, astutils, arguments, exceptions
+from rope.base.utils import pycompat
 
 
 def analyze_module(pycore, pymodule, should_analyze,
@@ -36,6 +39,42 @@ def _analyze_node(pycore, pydefined, should_analyze,
         visitor = SOAVisitor(pycore, pydefined, _follow)
         for child in rope.base.ast.get_child_nodes(pydefined.get_ast()):
             rope.base.ast.walk(child, visitor)
+        pycore.object_info.scope_analyzed(
+            pydefined, get_fingerprint(pydefined), visitor.callees)
+
+
+def get_fingerprint(pydefined):
+    """Return a fingerprint of the code of `pydefined`
+
+    The bodies of the sub-scopes are not included; changing them does
+    not change the fingerprint of the enclosing scope.
+
+    """
+    scope = pydefined.get_scope()
+    lines = pydefined.get_module().lines
+    skipped = set()
+    for subscope in scope.get_scopes():
+        start = max(subscope.get_body_start(), subscope.get_start() + 1)
+        skipped.update(range(start, subscope.get_end() + 1))
+    code = '\n'.join([lines.get_line(lineno)
+                      for lineno in range(scope.get_start(),
+                                          scope.get_end() + 1)
+                      if lineno not in skipped])
+    if isinstance(code, pycompat.str):
+        code = code.encode('utf-8')
+    return hashlib.sha1(code).hexdigest()
+
+
+def get_fingerprints(pymodule):
+    """Return a dict from the scopes of `pymodule` to their fingerprints"""
+    result = {}
+    pydefineds = [pymodule]
+    while pydefineds:
+        pydefined = pydefineds.pop()
+        result[pydefined] = get_fingerprint(pydefined)
+        pydefineds.extend(scope.pyobject
+                          for scope in pydefined.get_scope().get_scopes())
+    return result
 
 
 class SOAVisitor(object):
@@ -45,6 +84,7 @@ class SOAVisitor(object):
         self.pymodule = pydefined.get_module()
         self.scope = pydefined.get_scope()
         self.follow = follow_callback
+        self.callees = {}
 
     def _FunctionDef(self, node):
         pass
@@ -82,6 +122,9 @@ class SOAVisitor(object):
 
     def _call(self, pyfunction, args):
         if isinstance(pyfunction, pyobjects.PyFunction):
+            if pyfunction not in self.callees and \
+               pyfunction.get_module().get_resource() is not None:
+                self.callees[pyfunction] = get_fingerprint(pyfunction)
             if self.follow is not None:
                 before = self._parameter_objects(pyfunction)
             self.pycore.object_info.function_called(
@@ -137,3 +180,131 @@ class _SOAAssignVisitor(astutils._NodeNameCollector):
         if isinstance(node, rope.base.ast.Subscript) and \
            isinstance(node.slice, rope.base.ast.Index):
             self.nodes.append((node, levels))
+
+
+def dependency_layers(pycore, resources):
+    """Group `resources` into layers ordered by their imports
+
+    The modules of each layer only import modules of the previous
+    layers, except that the modules of an import cycle end up in the
+    same layer.  The modules of a layer keep their order in
+    `resources`.
+
+    """
+    resources = list(resources)
+    dependencies = {}
+    for resource in resources:
+        dependencies[resource] = []
+    for resource in resources:
+        for imported in _ImportedModules(pycore, resource).get_resources():
+            if imported in dependencies and imported != resource and \
+               imported not in dependencies[resource]:
+                dependencies[resource].append(imported)
+    levels = {}
+    for component in _strongly_connected_components(resources,
+                                                    dependencies):
+        # the components are found after the components they import
+        level = 0
+        for resource in component:
+            for imported in dependencies[resource]:
+                if imported not in component:
+                    level = max(level, levels[imported] + 1)
+        for resource in component:
+            levels[resource] = level
+    layers = []
+    for resource in resources:
+        while len(layers) <= levels[resource]:
+            layers.append([])
+        layers[levels[resource]].append(resource)
+    return layers
+
+
+def _strongly_connected_components(nodes, edges):
+    """Return the strongly connected components of a graph
+
+    This is an iterative version of Tarjan's algorithm.  Each
+    component comes after the components it has edges to.
+
+    """
+    indices = {}
+    lowlinks = {}
+    stack = []
+    on_stack = set()
+    result = []
+
+    def visit(node):
+        indices[node] = lowlinks[node] = len(indices)
+        stack.append(node)
+        on_stack.add(node)
+        work.append((node, iter(edges[node])))
+
+    for root in nodes:
+        if root in indices:
+            continue
+        work = []
+        visit(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in indices:
+                    visit(child)
+                    break
+                if child in on_stack:
+                    lowlinks[node] = min(lowlinks[node], indices[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+                if lowlinks[node] == indices[node]:
+                    component = set()
+                    while node not in component:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                    result.append(component)
+    return result
+
+
+class _ImportedModules(object):
+
+    def __init__(self, pycore, resource):
+        self.project = pycore.project
+        self.pycore = pycore
+        self.resource = resource
+        self.resources = []
+
+    def get_resources(self):
+        try:
+            pymodule = self.pycore.resource_to_pyobject(self.resource)
+        except exceptions.ModuleSyntaxError:
+            return []
+        rope.base.ast.walk(pymodule.get_ast(), self)
+        return self.resources
+
+    def _Import(self, node):
+        for alias in node.names:
+            self._add(self.project.find_module(alias.name,
+                                               self.resource.parent))
+
+    def _ImportFrom(self, node):
+        if node.level:
+            resource = self.project.find_relative_module(
+                node.module, self.resource.parent, node.level)
+        else:
+            resource = self.project.find_module(node.module,
+                                                self.resource.parent)
+        self._add(resource)
+        if resource is not None and resource.is_folder():
+            for alias in node.names:
+                self._add(self.project.find_relative_module(
+                    alias.name, resource, 1))
+
+    def _add(self, resource):
+        if resource is not None and resource.is_folder():
+            if resource.has_child('__init__.py'):
+                resource = resource.get_child('__init__.py')
+            else:
+                resource = None
+        if resource is not None:
+            self.resources.append(resource)
@@ -1,6 +1,7 @@
 """Provides classes for persisting `PyObject`\s"""
 import os
 import re
+import weakref
 
 import rope.base.builtins
 from rope.base import exceptions
@@ -16,6 +17,8 @@ class PyObjectToTextual(object):
 
     def __init__(self, project):
         self.project = project
+        # The textual form of defined objects never changes
+        self._defineds = weakref.WeakKeyDictionary()
 
     def transform(self, pyobject):
         """Transform a `PyObject` to textual form"""
@@ -46,18 +49,28 @@ class PyObjectToTextual(object):
         return self._defined_to_textual(pyobject)
 
     def _defined_to_textual(self, pyobject):
-        address = []
-        while pyobject.parent is not None:
-            address.insert(0, pyobject.get_name())
-            pyobject = pyobject.parent
-        return ('defined', self._get_pymodule_path(pyobject.get_module()),
+        if pyobject not in self._defineds:
+            address = []
+            current = pyobject
+            while current.parent is not None:
+                address.insert(0, current.get_name())
+                current = current.parent
+            self._defineds[pyobject] = (
+                'defined', self._get_pymodule_path(current.get_module()),
                 '.'.join(address))
+        return self._defineds[pyobject]
 
     def PyModule_to_textual(self, pyobject):
-        return ('defined', self._get_pymodule_path(pyobject))
+        return self._module_to_textual(pyobject)
 
     def PyPackage_to_textual(self, pyobject):
-        return ('defined', self._get_pymodule_path(pyobject))
+        return self._module_to_textual(pyobject)
+
+    def _module_to_textual(self, pyobject):
+        if pyobject not in self._defineds:
+            self._defineds[pyobject] = \
+                ('defined', self._get_pymodule_path(pyobject))
+        return self._defineds[pyobject]
 
     def List_to_textual(self, pyobject):
         return ('builtin', 'list', self.transform(pyobject.holding))
@@ -104,6 +117,7 @@ class TextualToPyObject(object):
 
     def __init__(self, project, allow_in_project_absolutes=False):
         self.project = project
+        self._defineds = {}
 
     def __call__(self, textual):
         return self.transform(textual)
@@ -114,11 +128,40 @@ class TextualToPyObject(object):
             return None
         type = textual[0]
         try:
+            if type == 'defined':
+                return self._cached_defined_to_pyobject(textual)
             method = getattr(self, type + '_to_pyobject')
             return method(textual)
         except AttributeError:
             return None
 
+    def forget_cache(self, path=None):
+        """Forget transformed defined objects
+
+        It should be called whenever a module is changed with the
+        textual path of that module.  If `path` is `None`, the objects
+        of all modules are forgotten.
+        """
+        if path is None:
+            self._defineds.clear()
+        else:
+            self._defineds.pop(path, None)
+
+    def _cached_defined_to_pyobject(self, textual):
+        # the cache maps module paths to dicts of textuals and objects
+        defineds = self._defineds.get(textual[1], {})
+        if textual in defineds:
+            return defineds[textual]
+        result = self.defined_to_pyobject(textual)
+        if result is not None:
+            # Only objects of valid modules the module cache holds (and
+            # invalidates) are cached
+            pymodule = result.get_module()
+            if not getattr(pymodule, 'has_errors', False) and \
+               pymodule.get_resource() == self.path_to_resource(textual[1]):
+                self._defineds.setdefault(textual[1], {})[textual] = result
+        return result
+
     def builtin_to_pyobject(self, textual):
         method = getattr(self, 'builtin_%s_to_pyobject' % textual[1], None)
         if method is not None:
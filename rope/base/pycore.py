@@ -1,6 +1,8 @@
 import bisect
 import difflib
+import multiprocessing
 import sys
+import threading
 import warnings
 
 import rope.base.libutils
@@ -22,11 +24,15 @@ class PyCore(object):
 
     def __init__(self, project):
         self.project = project
+        # serializes the changes to the module caches made by the
+        # threads using this pycore, like `codeassist.WarmUp`
+        self.lock = threading.RLock()
         self._init_resource_observer()
         self.cache_observers = []
         self.module_cache = _ModuleCache(self)
         self.extension_cache = _ExtensionCache(self)
         self.object_info = rope.base.oi.objectinfo.ObjectInfoManager(project)
+        self.cache_observers.append(self.object_info.module_changed)
         self._init_python_files()
         self._init_automatic_soa()
 
@@ -173,17 +179,76 @@ class PyCore(object):
         controlling the process.
 
         """
-        perform_doa = self.project.prefs.get('perform_doi', True)
-        perform_doa = self.project.prefs.get('perform_doa', perform_doa)
-        receiver = self.object_info.doa_data_received
-        if not perform_doa:
-            receiver = None
-        runner = rope.base.oi.doa.PythonFileRunner(
-            self, resource, args, stdin, stdout, receiver)
+        receiver = None
+        if self._perform_doa():
+            receiver = self.object_info.doa_data_received
+        runner = self._create_runner(resource, args, stdin, stdout, receiver)
         runner.add_finishing_observer(self.module_cache.forget_all_data)
         runner.run()
         return runner
 
+    def run_modules(self, resources, args=None, stdout=None, jobs=None):
+        """Run `resources` modules in parallel and wait for them
+
+        At most `jobs` modules are run at the same time; it defaults
+        to the number of CPUs.  The object information collected by
+        DOA is added to the objectdb after all modules finish.
+        Returns the finished `rope.base.oi.doa.PythonFileRunner`\s.
+
+        """
+        if jobs is None:
+            jobs = multiprocessing.cpu_count()
+        collected = []
+        receiver = None
+        if self._perform_doa():
+            receiver = collected.append
+        runners = []
+        running = []
+        finished = threading.Event()
+        for resource in resources:
+            while len(running) >= jobs:
+                self._wait_for_runners(running, finished)
+            runner = self._create_runner(resource, args, None, stdout,
+                                         receiver)
+            runner.run()
+            self._notify_when_finished(runner, finished)
+            runners.append(runner)
+            running.append(runner)
+        for runner in running:
+            runner.wait_process()
+        self.object_info.doa_bulk_data_received(collected)
+        self.module_cache.forget_all_data()
+        return runners
+
+    def _wait_for_runners(self, running, finished):
+        """Wait until a runner finishes and remove finished runners"""
+        finished.wait()
+        # the event is set after a process finishes; processes that
+        # finish before it is cleared are found by polling below
+        finished.clear()
+        for runner in list(running):
+            if runner.process.poll() is not None:
+                runner.wait_process()
+                running.remove(runner)
+
+    def _notify_when_finished(self, runner, finished):
+        def wait():
+            runner.process.wait()
+            finished.set()
+        thread = threading.Thread(target=wait)
+        thread.setDaemon(True)
+        thread.start()
+
+    def _perform_doa(self):
+        perform_doa = self.project.prefs.get('perform_doi', True)
+        return self.project.prefs.get('perform_doa', perform_doa)
+
+    def _create_runner(self, resource, args, stdin, stdout, receiver):
+        return rope.base.oi.doa.PythonFileRunner(
+            self, resource, args, stdin, stdout, receiver,
+            tracer=self.project.prefs.get('doa_tracer', 'trace'),
+            sampling=self.project.prefs.get('doa_sampling', 1))
+
     def analyze_module(self, resource, should_analyze=lambda py: True,
                        search_subscopes=lambda py: True, followed_calls=None):
         """Analyze `resource` module for static object inference
@@ -209,6 +274,62 @@ class PyCore(object):
         rope.base.oi.soa.analyze_module(
             self, pymodule, should_analyze, search_subscopes, followed_calls)
 
+    def analyze_modules(self, resources, should_analyze=lambda py: True,
+                        search_subscopes=lambda py: True, followed_calls=None,
+                        task_handle=taskhandle.NullTaskHandle()):
+        """Analyze `resources` modules for static object inference
+
+        Modules are analyzed after the modules they import; see
+        `rope.base.oi.soa.dependency_layers()`.  Since the modules of
+        each layer do not depend on each other, except for the modules
+        of an import cycle, the data concluded from the object
+        information is forgotten only before each layer and not before
+        every module as `analyze_module()` does.
+        The other arguments are like those of `analyze_module()`.
+
+        """
+        if followed_calls is None:
+            followed_calls = self.project.prefs.get('soa_followed_calls', 0)
+        resources = list(resources)
+        job_set = task_handle.create_jobset('Analyzing Modules',
+                                            len(resources))
+        for layer in rope.base.oi.soa.dependency_layers(self, resources):
+            self.module_cache.forget_all_data()
+            for resource in layer:
+                job_set.started_job(resource.path)
+                pymodule = self.resource_to_pyobject(resource)
+                rope.base.oi.soa.analyze_module(
+                    self, pymodule, should_analyze, search_subscopes,
+                    followed_calls)
+                job_set.finished_job()
+        self.module_cache.forget_all_data()
+
+    def analyze_stale_scopes(self, resources,
+                             task_handle=taskhandle.NullTaskHandle()):
+        """Analyze the scopes of `resources` that have become stale
+
+        A scope is stale if it was never analyzed or if its code or
+        the code of one of the functions it called has changed since
+        it was last analyzed; see
+        `ObjectInfoManager.get_stale_scopes()`.
+        Modules with syntax errors are skipped.
+
+        """
+        fingerprints = {}
+        for resource in resources:
+            try:
+                pymodule = self.resource_to_pyobject(resource)
+            except exceptions.ModuleSyntaxError:
+                continue
+            fingerprints.update(rope.base.oi.soa.get_fingerprints(pymodule))
+        stale = set(self.object_info.get_stale_scopes(fingerprints))
+        stale_modules = set(pydefined.get_module().get_resource()
+                            for pydefined in stale)
+        stale_resources = [resource for resource in resources
+                           if resource in stale_modules]
+        self.analyze_modules(stale_resources, lambda py: py in stale,
+                             task_handle=task_handle)
+
     def get_classes(self, task_handle=taskhandle.NullTaskHandle()):
         warnings.warn('`PyCore.get_classes()` is deprecated',
                       DeprecationWarning, stacklevel=2)
@@ -239,29 +360,32 @@ class _ModuleCache(object):
         self.observer = self.pycore.observer
 
     def _invalidate_resource(self, resource):
-        if resource in self.module_map:
-            self.forget_all_data()
-            self.observer.remove_resource(resource)
-            del self.module_map[resource]
+        with self.pycore.lock:
+            if resource in self.module_map:
+                self.forget_all_data()
+                self.observer.remove_resource(resource)
+                del self.module_map[resource]
 
     def get_pymodule(self, resource, force_errors=False):
-        if resource in self.module_map:
-            return self.module_map[resource]
-        if resource.is_folder():
-            result = PyPackage(self.pycore, resource,
-                               force_errors=force_errors)
-        else:
-            result = PyModule(self.pycore, resource=resource,
-                              force_errors=force_errors)
-            if result.has_errors:
-                return result
-        self.module_map[resource] = result
-        self.observer.add_resource(resource)
-        return result
+        with self.pycore.lock:
+            if resource in self.module_map:
+                return self.module_map[resource]
+            if resource.is_folder():
+                result = PyPackage(self.pycore, resource,
+                                   force_errors=force_errors)
+            else:
+                result = PyModule(self.pycore, resource=resource,
+                                  force_errors=force_errors)
+                if result.has_errors:
+                    return result
+            self.module_map[resource] = result
+            self.observer.add_resource(resource)
+            return result
 
     def forget_all_data(self):
-        for pymodule in self.module_map.values():
-            pymodule._forget_concluded_data()
+        with self.pycore.lock:
+            for pymodule in self.module_map.values():
+                pymodule._forget_concluded_data()
 
     def __str__(self):
         return 'PyCore caches %d PyModules\n' % len(self.module_map)
@@ -277,9 +401,11 @@ class _ExtensionCache(object):
         if name == '__builtin__':
             return builtins.builtins
         allowed = self.pycore.extension_modules
-        if name not in self.extensions and name in allowed:
-            self.extensions[name] = builtins.BuiltinModule(name, self.pycore)
-        return self.extensions.get(name)
+        with self.pycore.lock:
+            if name not in self.extensions and name in allowed:
+                self.extensions[name] = builtins.BuiltinModule(name,
+                                                               self.pycore)
+            return self.extensions.get(name)
 
 
 def perform_soa_on_changed_scopes(project, resource, old_contents):
@@ -312,16 +438,24 @@ class _TextChangeDetector(object):
         self._set_diffs()
 
     def _set_diffs(self):
-        differ = difflib.Differ()
+        old_lines = self.old.splitlines(True)
+        new_lines = self.new.splitlines(True)
+        # only the lines between the common head and tail are compared
+        start = 0
+        limit = min(len(old_lines), len(new_lines))
+        while start < limit and old_lines[start] == new_lines[start]:
+            start += 1
+        end = 0
+        limit -= start
+        while end < limit and old_lines[-end - 1] == new_lines[-end - 1]:
+            end += 1
+        matcher = difflib.SequenceMatcher(
+            None, old_lines[start:len(old_lines) - end],
+            new_lines[start:len(new_lines) - end])
         self.lines = []
-        lineno = 0
-        for line in differ.compare(self.old.splitlines(True),
-                                   self.new.splitlines(True)):
-            if line.startswith(' '):
-                lineno += 1
-            elif line.startswith('-'):
-                lineno += 1
-                self.lines.append(lineno)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ('replace', 'delete'):
+                self.lines.extend(range(start + i1 + 1, start + i2 + 1))
 
     def is_changed(self, start, end):
         """Tell whether any of start till end lines have changed
@@ -8,11 +8,6 @@ from rope.base import (pynamesdef as pynames, exceptions, ast,
                        astutils, pyobjects, fscommands, arguments, utils)
 from rope.base.utils import pycompat
 
-try:
-    unicode
-except NameError:
-    unicode = str
-
 
 class PyFunction(pyobjects.PyFunction):
 
@@ -170,23 +165,32 @@ class PyModule(pyobjects.PyModule):
         self.source_code = source
         self.star_imports = []
         self.visitor_class = _GlobalVisitor
-        self.coding = fscommands.read_str_coding(self.source_code)
         super(PyModule, self).__init__(pycore, node, resource)
 
+    @property
+    @utils.saveit
+    def coding(self):
+        """The encoding declared in the source; only docstrings need it"""
+        return fscommands.read_str_coding(self.source_code)
+
     def _init_source(self, pycore, source_code, resource):
         filename = 'string'
         if resource:
             filename = resource.path
         try:
+            source_data = source_code
             if source_code is None:
-                source_bytes = resource.read_bytes()
-                source_code = fscommands.file_data_to_unicode(source_bytes)
-            else:
-                if isinstance(source_code, unicode):
-                    source_bytes = fscommands.unicode_to_file_data(source_code)
-                else:
-                    source_bytes = source_code
-            ast_node = ast.parse(source_bytes, filename=filename)
+                source_data = resource.read_bytes()
+                try:
+                    source_code = fscommands.file_data_to_unicode(
+                        source_data, strict=True)
+                    source_data = source_code
+                except (UnicodeError, LookupError):
+                    # the undecoded data is parsed so that files that
+                    # cannot be decoded are reported as syntax errors
+                    source_code = fscommands.file_data_to_unicode(
+                        source_data)
+            ast_node = ast.parse_shared(source_data, filename=filename)
         except SyntaxError as e:
             raise exceptions.ModuleSyntaxError(filename, e.lineno, e.msg)
         except UnicodeDecodeError as e:
@@ -1,4 +1,5 @@
 import sys
+import threading
 import warnings
 
 
@@ -72,16 +73,21 @@ class _Cached(object):
         self.func = func
         self.cache = []
         self.count = count
+        # the cache might be used by other threads, like
+        # `rope.contrib.codeassist.WarmUp`; `func` is called unlocked
+        self.lock = threading.Lock()
 
     def __call__(self, *args, **kwds):
         key = (args, kwds)
-        for cached_key, cached_result in self.cache:
-            if cached_key == key:
-                return cached_result
+        with self.lock:
+            for cached_key, cached_result in self.cache:
+                if cached_key == key:
+                    return cached_result
         result = self.func(*args, **kwds)
-        self.cache.append((key, result))
-        if len(self.cache) > self.count:
-            del self.cache[0]
+        with self.lock:
+            self.cache.append((key, result))
+            if len(self.cache) > self.count:
+                del self.cache[0]
         return result
 
 
@@ -1,13 +1,15 @@
+import bisect
+import multiprocessing
 import re
 
-from rope.base import builtins
+from rope.base import ast
+from rope.base import astutils
 from rope.base import exceptions
 from rope.base import libutils
-from rope.base import pynames
-from rope.base import pyobjects
 from rope.base import resources
 from rope.base import resourceobserver
 from rope.base import taskhandle
+from rope.base.utils import pycompat
 from rope.refactor import importutils
 
 
@@ -29,84 +31,117 @@ class AutoImport(object):
         """
         self.project = project
         self.underlined = underlined
-        self.names = project.data_files.read_data('globalnames')
-        if self.names is None:
-            self.names = {}
-        project.data_files.add_write_hook(self._write)
+        self._cache = libutils.DataFilesCache(
+            project, ['globalnames', 'globalstamps'])
+        self._name_index = None
         # XXX: using a filtered observer
         observer = resourceobserver.ResourceObserver(
             changed=self._changed, moved=self._moved, removed=self._removed)
         if observe:
             project.add_observer(observer)
 
+    @property
+    def names(self):
+        """A dict from module names to the list of their global names
+
+        The cache is read from the project's data files when first
+        used.
+        """
+        return self._cache.get_data()[0]
+
+    @property
+    def _stamps(self):
+        return self._cache.get_data()[1]
+
     def import_assist(self, starting):
         """Return a list of ``(name, module)`` tuples
 
         This function tries to find modules that have a global name
         that starts with `starting`.
         """
-        # XXX: breaking if gave up! use generators
-        result = []
-        for module in self.names:
-            for global_name in self.names[module]:
-                if global_name.startswith(starting):
-                    result.append((global_name, module))
-        return result
+        return list(self.iter_import_assist(starting))
+
+    def iter_import_assist(self, starting):
+        """Like `import_assist()` but yield the tuples one by one
+
+        The names are yielded in sorted order and the caller can stop
+        whenever it has enough of them.  The cache should not change
+        while iterating.
+        """
+        return self._get_index().starting_with(starting)
 
     def get_modules(self, name):
         """Return the list of modules that have global `name`"""
-        result = []
-        for module in self.names:
-            if name in self.names[module]:
-                result.append(module)
-        return result
+        return list(self._get_index().get_modules(name))
 
     def get_all_names(self):
         """Return the list of all cached global names"""
-        result = set()
-        for module in self.names:
-            result.update(set(self.names[module]))
-        return result
+        return set(self._get_index().get_names())
 
     def get_name_locations(self, name):
         """Return a list of ``(resource, lineno)`` tuples"""
         result = []
-        for module in self.names:
-            if name in self.names[module]:
-                try:
-                    pymodule = self.project.get_module(module)
-                    if name in pymodule:
-                        pyname = pymodule[name]
-                        module, lineno = pyname.get_definition_location()
-                        if module is not None:
-                            resource = module.get_module().get_resource()
-                            if resource is not None and lineno is not None:
-                                result.append((resource, lineno))
-                except exceptions.ModuleNotFoundError:
-                    pass
+        for module in self.get_modules(name):
+            try:
+                pymodule = self.project.get_module(module)
+                if name in pymodule:
+                    pyname = pymodule[name]
+                    module, lineno = pyname.get_definition_location()
+                    if module is not None:
+                        resource = module.get_module().get_resource()
+                        if resource is not None and lineno is not None:
+                            result.append((resource, lineno))
+            except exceptions.ModuleNotFoundError:
+                pass
         return result
 
     def generate_cache(self, resources=None, underlined=None,
-                       task_handle=taskhandle.NullTaskHandle()):
+                       task_handle=taskhandle.NullTaskHandle(), jobs=1):
         """Generate global name cache for project files
 
         If `resources` is a list of `rope.base.resource.File`\s, only
         those files are searched; otherwise all python modules in the
         project are cached.
 
+        If `jobs` is more than one, the files are scanned by that many
+        worker processes.
+
+        Files that have not changed since they were cached are
+        skipped.
+
         """
         if resources is None:
             resources = self.project.get_python_files()
+        resources = [file for file in resources
+                     if not self._is_fresh(self._module_name(file), file,
+                                           underlined)]
         job_set = task_handle.create_jobset(
             'Generatig autoimport cache', len(resources))
+        if jobs > 1:
+            modules = [(self._module_name(file), file) for file in resources]
+            self._scan_modules(modules, underlined, job_set, jobs)
+            return
         for file in resources:
             job_set.started_job('Working on <%s>' % file.path)
             self.update_resource(file, underlined)
             job_set.finished_job()
 
     def generate_modules_cache(self, modules, underlined=None,
-                               task_handle=taskhandle.NullTaskHandle()):
-        """Generate global name cache for modules listed in `modules`"""
+                               task_handle=taskhandle.NullTaskHandle(),
+                               jobs=1):
+        """Generate global name cache for modules listed in `modules`
+
+        `jobs` is like the one in `generate_cache()`; modules without
+        python sources, like extension modules, are still handled in
+        this process.  Modules whose source files have the same path,
+        modification time and size as when they were cached are not
+        scanned again.
+
+        """
+        if jobs > 1:
+            self._generate_modules_cache_in_parallel(
+                modules, underlined, task_handle, jobs)
+            return
         job_set = task_handle.create_jobset(
             'Generatig autoimport cache for modules', len(modules))
         for modname in modules:
@@ -115,11 +150,64 @@ class AutoImport(object):
                 mod = self.project.find_module(modname[:-2])
                 if mod:
                     for sub in submodules(mod):
-                        self.update_resource(sub, underlined)
-            else:
+                        if not self._is_fresh(self._module_name(sub), sub,
+                                              underlined):
+                            self.update_resource(sub, underlined)
+            elif not self._is_fresh(modname, self.project.find_module(modname),
+                                    underlined):
                 self.update_module(modname, underlined)
             job_set.finished_job()
 
+    def _generate_modules_cache_in_parallel(self, modules, underlined,
+                                            task_handle, jobs):
+        sources = []
+        others = []
+        for modname in modules:
+            if modname.endswith('.*'):
+                mod = self.project.find_module(modname[:-2])
+                if mod:
+                    for sub in submodules(mod):
+                        sources.append((self._module_name(sub), sub))
+            else:
+                resource = self.project.find_module(modname)
+                if resource is not None:
+                    sources.append((modname, resource))
+                else:
+                    others.append(modname)
+        sources = [(modname, resource) for modname, resource in sources
+                   if not self._is_fresh(modname, resource, underlined)]
+        job_set = task_handle.create_jobset(
+            'Generatig autoimport cache for modules',
+            len(sources) + len(others))
+        self._scan_modules(sources, underlined, job_set, jobs)
+        for modname in others:
+            job_set.started_job('Working on <%s>' % modname)
+            self.update_module(modname, underlined)
+            job_set.finished_job()
+
+    def _scan_modules(self, modules, underlined, job_set, jobs):
+        if underlined is None:
+            underlined = self.underlined
+        args = []
+        stamps = {}
+        for modname, resource in modules:
+            if resource.is_folder():
+                if not resource.has_child('__init__.py'):
+                    continue
+                resource = resource.get_child('__init__.py')
+            args.append((modname, resource.real_path, underlined))
+            stamps[modname] = self._get_stamp(resource, underlined)
+        pool = multiprocessing.Pool(jobs)
+        try:
+            for modname, names in pool.imap_unordered(_scan_module, args):
+                job_set.started_job('Working on <%s>' % modname)
+                if names is not None:
+                    self._set_names(modname, names, stamps[modname])
+                job_set.finished_job()
+        finally:
+            pool.terminate()
+            pool.join()
+
     def clear_cache(self):
         """Clear all entries in global-name cache
 
@@ -128,6 +216,8 @@ class AutoImport(object):
 
         """
         self.names.clear()
+        self._stamps.clear()
+        self._name_index = None
 
     def find_insertion_line(self, code):
         """Guess at what line the new import should be inserted"""
@@ -150,23 +240,38 @@ class AutoImport(object):
 
     def update_resource(self, resource, underlined=None):
         """Update the cache for global names in `resource`"""
-        try:
-            pymodule = self.project.get_pymodule(resource)
-            modname = self._module_name(resource)
-            self._add_names(pymodule, modname, underlined)
-        except exceptions.ModuleSyntaxError:
-            pass
+        self._update_source_names(self._module_name(resource), resource,
+                                  underlined)
 
     def update_module(self, modname, underlined=None):
         """Update the cache for global names in `modname` module
 
-        `modname` is the name of a module.
+        `modname` is the name of a module.  Only extension modules
+        are imported; the names of the others are read from their
+        sources.
         """
-        try:
-            pymodule = self.project.get_module(modname)
+        pymodule = self.project.pycore.builtin_module(modname)
+        if pymodule is not None:
             self._add_names(pymodule, modname, underlined)
-        except exceptions.ModuleNotFoundError:
-            pass
+            return
+        resource = self.project.find_module(modname)
+        if resource is not None:
+            self._update_source_names(modname, resource, underlined)
+
+    def _update_source_names(self, modname, resource, underlined):
+        if underlined is None:
+            underlined = self.underlined
+        stamp = self._get_stamp(resource, underlined)
+        if resource.is_folder():
+            if not resource.has_child('__init__.py'):
+                self._set_names(modname, [])
+                return
+            resource = resource.get_child('__init__.py')
+        try:
+            names = get_global_names(resource.read_bytes(), underlined)
+        except SyntaxError:
+            return
+        self._set_names(modname, names, stamp)
 
     def _module_name(self, resource):
         return libutils.modname(resource)
@@ -174,22 +279,53 @@ class AutoImport(object):
     def _add_names(self, pymodule, modname, underlined):
         if underlined is None:
             underlined = self.underlined
-        globals = []
-        if isinstance(pymodule, pyobjects.PyDefinedObject):
-            attributes = pymodule._get_structural_attributes()
-        else:
-            attributes = pymodule.get_attributes()
-        for name, pyname in attributes.items():
-            if not underlined and name.startswith('_'):
-                continue
-            if isinstance(pyname, (pynames.AssignedName, pynames.DefinedName)):
-                globals.append(name)
-            if isinstance(pymodule, builtins.BuiltinModule):
-                globals.append(name)
-        self.names[modname] = globals
-
-    def _write(self):
-        self.project.data_files.write_data('globalnames', self.names)
+        globals = [name for name in pymodule.get_attributes()
+                   if underlined or not name.startswith('_')]
+        self._set_names(modname, globals)
+
+    def _set_names(self, modname, names, stamp=None):
+        self._remove_names(modname)
+        self.names[modname] = names
+        if stamp is not None:
+            self._stamps[modname] = stamp
+        if self._name_index is not None:
+            self._name_index.add(modname, names)
+
+    def _remove_names(self, modname):
+        if modname in self.names:
+            if self._name_index is not None:
+                self._name_index.remove(modname, self.names[modname])
+            del self.names[modname]
+        self._stamps.pop(modname, None)
+
+    def _get_stamp(self, resource, underlined):
+        """Return what tells whether the names of `resource` are fresh"""
+        if resource is None:
+            return None
+        if resource.is_folder():
+            if not resource.has_child('__init__.py'):
+                return None
+            resource = resource.get_child('__init__.py')
+        if underlined is None:
+            underlined = self.underlined
+        stamp = libutils.get_file_stamp(resource)
+        if stamp is None:
+            return None
+        return stamp + (underlined,)
+
+    def _is_fresh(self, modname, resource, underlined):
+        if modname not in self.names:
+            return False
+        stamp = self._stamps.get(modname)
+        return stamp is not None and \
+            stamp == self._get_stamp(resource, underlined)
+
+    def _get_index(self):
+        if self._name_index is None:
+            self._name_index = _NameIndex()
+            for modname, names in self.names.items():
+                self._name_index.add(modname, names)
+        return self._name_index
 
     def _changed(self, resource):
         if not resource.is_folder():
@@ -197,16 +333,164 @@ class AutoImport(object):
 
     def _moved(self, resource, newresource):
         if not resource.is_folder():
-            modname = self._module_name(resource)
-            if modname in self.names:
-                del self.names[modname]
+            self._remove_names(self._module_name(resource))
             self.update_resource(newresource)
 
     def _removed(self, resource):
         if not resource.is_folder():
-            modname = self._module_name(resource)
-            if modname in self.names:
-                del self.names[modname]
+            self._remove_names(self._module_name(resource))
+
+
+class _NameIndex(object):
+    """An index of cached global names
+
+    It maps each name to the modules defining it and keeps the sorted
+    list of names for finding the names that start with a prefix.  The
+    sorted list is rebuilt lazily when names are added or removed.
+
+    """
+
+    def __init__(self):
+        self.modules = {}
+        self.sorted_names = []
+        self.sorted = True
+
+    def add(self, modname, names):
+        for name in names:
+            if name not in self.modules:
+                self.modules[name] = []
+                self.sorted = False
+            if modname not in self.modules[name]:
+                self.modules[name].append(modname)
+
+    def remove(self, modname, names):
+        for name in names:
+            modules = self.modules.get(name, [])
+            if modname in modules:
+                modules.remove(modname)
+                if not modules:
+                    del self.modules[name]
+                    self.sorted = False
+
+    def get_modules(self, name):
+        return self.modules.get(name, [])
+
+    def get_names(self):
+        return self.modules.keys()
+
+    def starting_with(self, prefix):
+        names = self._get_sorted_names()
+        index = bisect.bisect_left(names, prefix)
+        while index < len(names) and names[index].startswith(prefix):
+            for modname in self.modules[names[index]]:
+                yield names[index], modname
+            index += 1
+
+    def _get_sorted_names(self):
+        if not self.sorted:
+            self.sorted_names = sorted(self.modules)
+            self.sorted = True
+        return self.sorted_names
+
+
+def _scan_module(args):
+    """Return the global names of a python file for `AutoImport`
+
+    This function is run in worker processes; `args` is a tuple of
+    module name, file path and whether to include underlined names.
+    The names are `None` if the file cannot be read or parsed.
+
+    """
+    modname, path, underlined = args
+    try:
+        source_file = open(path, 'rb')
+        try:
+            source = source_file.read()
+        finally:
+            source_file.close()
+        return modname, get_global_names(source, underlined)
+    except (IOError, SyntaxError):
+        return modname, None
+
+
+def get_global_names(source, underlined=False):
+    """Return the names defined in the top-level statements of `source`
+
+    The names are found in the syntax tree without building a
+    `PyModule`, following the rules `PyModule` uses for its names;
+    imported names are excluded.  Raises `SyntaxError` if `source`
+    cannot be parsed.
+
+    """
+    collector = _GlobalNamesCollector()
+    # the trees of scanned modules are not shared; they would push the
+    # trees of edited modules out of the cache
+    for node in ast.parse(source).body:
+        ast.walk(node, collector)
+    return [name for name, kind in collector.names.items()
+            if kind != 'imported' and (underlined or not name.startswith('_'))]
+
+
+class _GlobalNamesCollector(object):
+    """Collect the kinds of module-level names like `PyModule` does"""
+
+    def __init__(self):
+        self.names = {}
+
+    def _ClassDef(self, node):
+        self.names[node.name] = 'defined'
+
+    def _FunctionDef(self, node):
+        self.names[node.name] = 'defined'
+
+    def _AsyncFunctionDef(self, node):
+        self._FunctionDef(node)
+
+    def _Assign(self, node):
+        for target in node.targets:
+            self._assigned(target)
+
+    def _AugAssign(self, node):
+        pass
+
+    def _For(self, node):
+        self._assigned(node.target)
+        for child in node.body + node.orelse:
+            ast.walk(child, self)
+
+    def _With(self, node):
+        for item in pycompat.get_ast_with_items(node):
+            if item.optional_vars:
+                self._assigned(item.optional_vars)
+        for child in node.body:
+            ast.walk(child, self)
+
+    def _ExceptHandler(self, node):
+        if node.name is not None:
+            if isinstance(node.name, pycompat.string_types):
+                self._add_assigned(node.name)
+            else:
+                self._assigned(node.name)
+        for child in node.body:
+            ast.walk(child, self)
+
+    def _Import(self, node):
+        for alias in node.names:
+            name = alias.asname or alias.name.split('.')[0]
+            self.names[name] = 'imported'
+
+    def _ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name != '*':
+                self.names[alias.asname or alias.name] = 'imported'
+
+    def _assigned(self, node):
+        for name, levels in astutils.get_name_levels(node):
+            self._add_assigned(name)
+
+    def _add_assigned(self, name):
+        if self.names.get(name, 'assigned') == 'assigned':
+            self.names[name] = 'assigned'
 
 
 def submodules(mod):
@@ -1,9 +1,11 @@
 import keyword
 import sys
+import threading
 import warnings
 
 import rope.base.codeanalyze
 import rope.base.evaluate
+from rope.base import ast
 from rope.base import builtins
 from rope.base import exceptions
 from rope.base import libutils
@@ -12,13 +14,18 @@ from rope.base import pynamesdef
 from rope.base import pyobjects
 from rope.base import pyobjectsdef
 from rope.base import pyscopes
+from rope.base import resourceobserver
+from rope.base import stdmods
+from rope.base import taskhandle
+from rope.base import utils
 from rope.base import worder
+from rope.contrib import definitions
 from rope.contrib import fixsyntax
 from rope.refactor import functionutils
 
 
 def code_assist(project, source_code, offset, resource=None,
-                templates=None, maxfixes=1, later_locals=True):
+                templates=None, maxfixes=1, later_locals=True, cache=None):
     """Return python code completions as a list of `CodeAssistProposal`\s
 
     `resource` is a `rope.base.resources.Resource` object.  If
@@ -30,6 +37,9 @@ def code_assist(project, source_code, offset, resource=None,
     If `later_locals` is `False` names defined in this scope and after
     this line is ignored.
 
+    `cache` can be a `CompletionCache` for reusing the completions of
+    previous calls.
+
     """
     if templates is not None:
         warnings.warn('Codeassist no longer supports templates',
@@ -37,7 +47,204 @@ def code_assist(project, source_code, offset, resource=None,
     assist = _PythonCodeAssist(
         project, source_code, offset, resource=resource,
         maxfixes=maxfixes, later_locals=later_locals)
-    return assist()
+    if cache is None:
+        return assist()
+    key = assist.get_cache_key()
+    result = cache.get(key, assist.starting)
+    if result is None:
+        result = assist()
+        cache.add(key, assist.starting, result)
+    return result
+
+
+class CompletionCache(object):
+    """Reuse the completions of `code_assist()` while a name is typed
+
+    Completing ``foo.ba`` after ``foo.b`` in the same code only
+    filters the proposals found for ``foo.b``.  The proposals of a
+    call are reused only if the code other than the name being
+    completed is the same, and the cache is cleared whenever a
+    resource in the project changes.  Call `close()` when the cache
+    is no longer used; it observes the project until then.
+
+    """
+
+    def __init__(self, project, size=8):
+        self.project = project
+        self.size = size
+        self.entries = []
+        self.observer = resourceobserver.ResourceObserver(
+            changed=self._resource_changed, moved=self._resource_changed,
+            created=self._resource_changed, removed=self._resource_changed)
+        project.add_observer(self.observer)
+
+    def get(self, key, starting):
+        """Return the proposals for `key` starting with `starting`
+
+        Returns `None` if the proposals are not cached.
+        """
+        for index, entry in enumerate(self.entries):
+            entry_key, entry_starting, proposals = entry
+            # keywords are not proposed for empty names; the entries
+            # of empty names are reused only for empty names
+            if entry_starting == '' and starting != '':
+                continue
+            if entry_key == key and starting.startswith(entry_starting):
+                del self.entries[index]
+                self.entries.insert(0, entry)
+                return [proposal for proposal in proposals
+                        if proposal.name.startswith(starting)]
+
+    def add(self, key, starting, proposals):
+        self.entries.insert(0, (key, starting, list(proposals)))
+        del self.entries[self.size:]
+
+    def clear(self):
+        self.entries = []
+
+    def close(self):
+        """Stop observing the project and forget the proposals"""
+        self.project.remove_observer(self.observer)
+        self.clear()
+
+    def _resource_changed(self, resource, new_resource=None):
+        self.clear()
+
+
+def warm_up(project, resources=None, depth=1,
+            task_handle=taskhandle.NullTaskHandle()):
+    """Fill the caches used by code assists
+
+    Finds the standard modules and imports `extension_modules`.  The
+    modules in `resources`, the user's working set, are parsed along
+    with the modules they import, up to `depth` levels of imports.
+
+    Only the module caches of the project's pycore, which are guarded
+    by its lock, are filled; the attributes of modules and the object
+    information are not computed.  So this function can be called in
+    a thread other than the one using the project.
+
+    """
+    pycore = project.pycore
+    job_set = task_handle.create_jobset('Warming up code assists')
+    job_set.started_job('Standard modules')
+    stdmods.standard_modules()
+    job_set.finished_job()
+    for name in sorted(pycore.extension_modules):
+        job_set.started_job('Importing <%s>' % name)
+        pymodule = pycore.builtin_module(name)
+        if pymodule is not None:
+            # every thread saves the same imported module
+            pymodule.module
+        job_set.finished_job()
+    visited = set()
+    current = list(resources or [])
+    for level in range(depth + 1):
+        imported = []
+        for resource in current:
+            if resource in visited:
+                continue
+            visited.add(resource)
+            job_set.started_job('Parsing <%s>' % resource.path)
+            try:
+                pymodule = project.get_pymodule(resource)
+            except exceptions.ModuleSyntaxError:
+                pymodule = None
+            if pymodule is not None and level < depth and \
+               not resource.is_folder():
+                imported.extend(
+                    _get_imported_resources(project, resource, pymodule))
+            job_set.finished_job()
+        current = imported
+
+
+def _get_imported_resources(project, resource, pymodule):
+    # the imports are read from the syntax tree; resolving the names
+    # of the module would compute its attributes
+    collector = _ImportCollector()
+    for node in pymodule.get_ast().body:
+        ast.walk(node, collector)
+    folder = resource.parent
+    result = []
+    for modname, level in collector.imports:
+        if level:
+            found = project.find_relative_module(modname, folder, level)
+        else:
+            found = project.find_module(modname, folder)
+        if found is not None:
+            result.append(found)
+    return result
+
+
+class _ImportCollector(object):
+
+    def __init__(self):
+        self.imports = []
+
+    def _Import(self, node):
+        for alias in node.names:
+            self.imports.append((alias.name, 0))
+
+    def _ImportFrom(self, node):
+        level = node.level or 0
+        self.imports.append((node.module, level))
+        for alias in node.names:
+            if alias.name != '*':
+                name = alias.name
+                if node.module:
+                    name = node.module + '.' + name
+                self.imports.append((name, level))
+
+    def _FunctionDef(self, node):
+        pass
+
+    def _AsyncFunctionDef(self, node):
+        pass
+
+    def _ClassDef(self, node):
+        pass
+
+
+class WarmUp(object):
+    """Run `warm_up()` in a background thread
+
+    The thread is started by `start()` and can be interrupted by
+    `stop()`; it checks for interrupts between modules.  The project
+    can be used meanwhile; the thread only fills the module caches,
+    which are guarded by the lock of the project's pycore, so using
+    them might wait for the module the thread is parsing.
+
+    """
+
+    def __init__(self, project, resources=None, depth=1):
+        self.project = project
+        self.resources = resources
+        self.depth = depth
+        self.task_handle = taskhandle.TaskHandle('Warm up')
+        self.thread = threading.Thread(target=self._run)
+        self.thread.setDaemon(True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Interrupt the thread and wait for it to finish"""
+        self.task_handle.stop()
+        if self.thread.is_alive():
+            self.join()
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+    def is_done(self):
+        return not self.thread.is_alive()
+
+    def _run(self):
+        try:
+            warm_up(self.project, self.resources, self.depth,
+                    self.task_handle)
+        except exceptions.InterruptedTaskError:
+            pass
 
 
 def starting_offset(source_code, offset):
@@ -102,7 +309,7 @@ def get_calltip(project, source_code, offset, resource=None,
 
 
 def get_definition_location(project, source_code, offset,
-                            resource=None, maxfixes=1):
+                            resource=None, maxfixes=1, index=None):
     """Return the definition location of the python name at `offset`
 
     Return a (`rope.base.resources.Resource`, lineno) tuple.  If no
@@ -110,6 +317,10 @@ def get_definition_location(project, source_code, offset,
     the first element of the returned tuple would be `None`.  If the
     location cannot be determined ``(None, None)`` is returned.
 
+    `index` can be a `rope.contrib.definitions.DefinitionIndex` for
+    finding names that cannot be resolved; see
+    `rope.contrib.findit.find_definition()`.
+
     """
     fixer = fixsyntax.FixSyntax(project, source_code, resource, maxfixes)
     pyname = fixer.pyname_at(offset)
@@ -117,6 +328,12 @@ def get_definition_location(project, source_code, offset,
         module, lineno = pyname.get_definition_location()
         if module is not None:
             return module.get_module().get_resource(), lineno
+    elif index is not None:
+        expression = definitions.get_expression_at(source_code, offset)
+        candidates = index.find(expression) if expression else []
+        if len(candidates) == 1:
+            qualified_name, resource, lineno, kind = candidates[0]
+            return resource, lineno
     return (None, None)
 
 
@@ -222,6 +439,7 @@ class CompletionProposal(object):
         return str(self)
 
     @property
+    @utils.saveit
     def parameters(self):
         """The names of the parameters the function takes.
 
@@ -236,6 +454,7 @@ class CompletionProposal(object):
                 return pyobject.get_param_names()
 
     @property
+    @utils.saveit
     def type(self):
         pyname = self.pyname
         if isinstance(pyname, builtins.BuiltinName):
@@ -331,6 +550,24 @@ def sorted_proposals(proposals, scopepref=None, typepref=None):
     return sorter.get_sorted_proposal_list()
 
 
+def iter_sorted_proposals(proposals, scopepref=None):
+    """Yield the given `CodeAssistProposal`\s in sorted order
+
+    Unlike `sorted_proposals()`, the types of the proposals are not
+    used; proposals are ordered by their scope, the number of
+    underlines in their names and their names.  Finding the type of a
+    proposal evaluates the proposed object, so this is much cheaper for
+    scopes with many names.  The `type`, `parameters` and `get_doc()`
+    of a proposal are computed only when asked for, and the proposals
+    of each scope are sorted only when reached; use something like
+    ``itertools.islice()`` for taking only the first few.
+
+    `scopepref` is like the one in `sorted_proposals()`.
+    """
+    sorter = _ProposalSorter(proposals, scopepref)
+    return sorter.iter_proposals()
+
+
 def starting_expression(source_code, offset):
     """Return the expression to complete"""
     word_finder = worder.Worder(source_code, True)
@@ -362,6 +599,15 @@ class _PythonCodeAssist(object):
 
     keywords = keyword.kwlist
 
+    def get_cache_key(self):
+        """Return what completions at this offset depend on
+
+        Everything but the name being completed is included.
+        """
+        end = self.offset + len(self.starting)
+        return (self.resource, self.expression, self.maxfixes,
+                self.later_locals, self.code[:self.offset], self.code[end:])
+
     def _find_starting_offset(self, source_code, offset):
         current_offset = offset - 1
         while current_offset >= 0 and (source_code[current_offset].isalnum() or
@@ -519,9 +765,7 @@ class _ProposalSorter(object):
 
     def get_sorted_proposal_list(self):
         """Return a list of `CodeAssistProposal`"""
-        proposals = {}
-        for proposal in self.proposals:
-            proposals.setdefault(proposal.scope, []).append(proposal)
+        proposals = self._get_scope_proposals()
         result = []
         for scope in self.scopepref:
             scope_proposals = proposals.get(scope, [])
@@ -531,17 +775,27 @@ class _ProposalSorter(object):
             result.extend(scope_proposals)
         return result
 
+    def iter_proposals(self):
+        """Yield `CodeAssistProposal`\s without using their types"""
+        proposals = self._get_scope_proposals()
+        for scope in self.scopepref:
+            scope_proposals = proposals.get(scope, [])
+            scope_proposals.sort(key=self._name_key)
+            for proposal in scope_proposals:
+                yield proposal
+
+    def _get_scope_proposals(self):
+        proposals = {}
+        for proposal in self.proposals:
+            proposals.setdefault(proposal.scope, []).append(proposal)
+        return proposals
+
     def _proposal_key(self, proposal1):
-        def _underline_count(name):
-             return sum(1 for c in name if c == "_")
-        return (self.typerank.get(proposal1.type, 100),
-                _underline_count(proposal1.name),
-                proposal1.name)
-        #if proposal1.type != proposal2.type:
-        #    return cmp(self.typerank.get(proposal1.type, 100),
-        #               self.typerank.get(proposal2.type, 100))
-        #return self._compare_underlined_names(proposal1.name,
-        #                                      proposal2.name)
+        return (self.typerank.get(proposal1.type, 100),) + \
+            self._name_key(proposal1)
+
+    def _name_key(self, proposal):
+        return (proposal.name.count('_'), proposal.name)
 
 
 class PyDocExtractor(object):
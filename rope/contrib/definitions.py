@@ -0,0 +1,475 @@
+import re
+
+from rope.base import ast
+from rope.base import astutils
+from rope.base import exceptions
+from rope.base import libutils
+from rope.base import resourceobserver
+from rope.base import taskhandle
+from rope.base import worder
+
+
+class DefinitionIndex(object):
+    """An index of the names defined in project modules
+
+    This class maps qualified names like ``pkg.mod.Class.method`` to
+    the places they are defined in.  Module-level names and the names
+    defined in class bodies are indexed; imported names are not.  The
+    base classes of classes are indexed, too, for finding subclasses.
+    The index is read from syntax trees and, like `AutoImport`, it is
+    not accurate and might be out of date.
+
+    """
+
+    def __init__(self, project, observe=True):
+        """Construct a DefinitionIndex object
+
+        If `observe` is `True`, listen for project changes and update
+        the index.  Otherwise, project changes only mark the changed
+        modules as stale; see `get_stale_resources()`.
+        """
+        self.project = project
+        self.observe = observe
+        self._cache = libutils.DataFilesCache(
+            project, ['definitions', 'definitionaliases'])
+        self._short_names = None
+        self._subclasses = None
+        self._aliases = None
+        self._stale = None
+        self.observer = resourceobserver.ResourceObserver(
+            changed=self._changed, moved=self._moved, created=self._changed,
+            removed=self._removed)
+        project.add_observer(self.observer)
+
+    @property
+    def modules(self):
+        """A dict from module names to their indexed data
+
+        The values are ``(path, stamp, definitions, bases)`` tuples.
+        `definitions` is a list of ``(qualified name, lineno, kind)``
+        tuples; `kind` is one of ``'class'``, ``'function'`` and
+        ``'variable'``.  `bases` is a list of ``(qualified name, base
+        names)`` tuples for the classes of the module, including the
+        classes defined in functions; the base names are the last
+        parts of the base class expressions and `None` for the bases
+        that cannot be named.  The index is read from the project's
+        data files when first used.
+        """
+        return self._cache.get_data()[0]
+
+    @property
+    def module_aliases(self):
+        """A dict from module names to the aliases of their names
+
+        The values are lists of ``(alias, name)`` tuples for the names
+        assigned to or imported as other names in the module, in any
+        scope.  Like base names, both are the last parts of the names.
+        """
+        return self._cache.get_data()[1]
+
+    def generate_cache(self, resources=None,
+                       task_handle=taskhandle.NullTaskHandle()):
+        """Index the definitions of project files
+
+        If `resources` is a list of `rope.base.resource.File`\s, only
+        those files are indexed; otherwise all python modules in the
+        project are.  Files that have not changed since they were
+        indexed are skipped.
+
+        """
+        if resources is None:
+            resources = self.project.get_python_files()
+        resources = [file for file in resources if not self._is_fresh(file)]
+        job_set = task_handle.create_jobset(
+            'Generating definition index', len(resources))
+        for file in resources:
+            job_set.started_job('Working on <%s>' % file.path)
+            self.update_resource(file)
+            job_set.finished_job()
+
+    def update_resource(self, resource):
+        """Update the definitions of `resource`"""
+        modname = libutils.modname(resource)
+        try:
+            collector = _collect(resource.read_bytes(), modname)
+        except SyntaxError:
+            return
+        self._set_definitions(modname, (resource.path,
+                                        libutils.get_file_stamp(resource),
+                                        collector.definitions,
+                                        collector.bases),
+                              collector.bindings)
+        self._update_stale(resource)
+
+    def clear_cache(self):
+        """Remove all entries of the index"""
+        self.modules.clear()
+        self.module_aliases.clear()
+        self._short_names = None
+        self._subclasses = None
+        self._aliases = None
+        self._stale = None
+
+    def close(self):
+        """Stop observing the project"""
+        self.project.remove_observer(self.observer)
+
+    def get_location(self, qualified_name):
+        """Return the ``(resource, lineno)`` `qualified_name` is defined in
+
+        ``(None, None)`` is returned if the name is not indexed.
+        """
+        modname = qualified_name
+        while modname:
+            if modname in self.modules:
+                path, stamp, definitions, bases = self.modules[modname]
+                for name, lineno, kind in definitions:
+                    if name == qualified_name:
+                        return self._get_resource(path), lineno
+            modname = modname.rpartition('.')[0]
+        return (None, None)
+
+    def find(self, expression):
+        """Return the definitions that might match `expression`
+
+        `expression` is a dotted name like ``obj.attr``; the returned
+        ``(qualified name, resource, lineno, kind)`` tuples are for the
+        qualified names ending with the longest trailing part of
+        `expression` that is indexed.
+        """
+        names = expression.split('.')
+        candidates = self._get_short_names().get(names[-1], [])
+        for start in range(len(names)):
+            suffix = '.'.join(names[start:])
+            result = []
+            for qualified_name, modname in candidates:
+                if qualified_name == suffix or \
+                   qualified_name.endswith('.' + suffix):
+                    result.extend(self._get_definitions(modname,
+                                                        qualified_name))
+            if result:
+                return result
+        return []
+
+    def get_subclasses(self, name):
+        """Return the classes that might directly subclass `name`
+
+        `name` is the name of a class, without its module.  A list of
+        ``(qualified name, resource)`` tuples is returned for the
+        classes that have a base class whose name is `name`.  Names
+        assigned to or imported as other names are followed, but only
+        within each module.
+        """
+        result = []
+        for qualified_name, modname in self._get_subclasses().get(name, []):
+            resource = self._get_resource(self.modules[modname][0])
+            if resource is not None:
+                result.append((qualified_name, resource))
+        return result
+
+    def get_aliases(self, name):
+        """Return the names that might be bound to `name`
+
+        `name` is the last part of a name.  A list of ``(alias,
+        resource)`` tuples is returned for the modules that assign
+        `name` to or import it as `alias`.
+        """
+        result = []
+        for alias, modname in self._get_aliases().get(name, []):
+            resource = self._get_resource(self.modules[modname][0])
+            if resource is not None:
+                result.append((alias, resource))
+        return result
+
+    def get_classes_with_unknown_bases(self):
+        """Return the classes with base classes that cannot be named
+
+        The bases are expressions like function calls; a list of
+        ``(qualified name, resource)`` tuples is returned.
+        """
+        return self.get_subclasses(None)
+
+    def get_stale_resources(self, resources=None):
+        """Return the resources that are not indexed or have changed
+
+        If `resources` is `None`, the stale python files of the
+        project are returned.  They are found when first asked for and
+        then updated when the project reports changes, so files changed
+        outside rope are not found until `clear_cache()` or
+        `generate_cache()` is called.  Modules with syntax errors are
+        not indexed.
+        """
+        if resources is not None:
+            return [resource for resource in resources
+                    if not self._is_fresh(resource)]
+        if self._stale is None:
+            self._stale = set(resource
+                              for resource in self.project.get_python_files()
+                              if not self._is_fresh(resource))
+        return list(self._stale)
+
+    def _get_definitions(self, modname, qualified_name):
+        path, stamp, definitions, bases = self.modules[modname]
+        resource = self._get_resource(path)
+        if resource is None:
+            return []
+        return [(name, resource, lineno, kind)
+                for name, lineno, kind in definitions
+                if name == qualified_name]
+
+    def _get_resource(self, path):
+        try:
+            return self.project.get_resource(path)
+        except exceptions.ResourceNotFoundError:
+            return None
+
+    def _set_definitions(self, modname, data, aliases):
+        self._remove_definitions(modname)
+        self.modules[modname] = data
+        self.module_aliases[modname] = aliases
+        if self._short_names is not None:
+            self._add_short_names(modname, data)
+        if self._subclasses is not None:
+            self._add_subclasses(modname, data)
+        if self._aliases is not None:
+            self._add_aliases(modname, aliases)
+
+    def _remove_definitions(self, modname):
+        if modname in self.modules:
+            path, stamp, definitions, bases = self.modules[modname]
+            if self._short_names is not None:
+                for name, lineno, kind in definitions:
+                    _remove_entry(self._short_names, _short_name(name),
+                                  (name, modname))
+            if self._subclasses is not None:
+                for name, base_names in bases:
+                    for base_name in base_names:
+                        _remove_entry(self._subclasses, base_name,
+                                      (name, modname))
+            del self.modules[modname]
+        if modname in self.module_aliases:
+            if self._aliases is not None:
+                for alias, name in self.module_aliases[modname]:
+                    _remove_entry(self._aliases, name, (alias, modname))
+            del self.module_aliases[modname]
+
+    def _get_short_names(self):
+        if self._short_names is None:
+            self._short_names = {}
+            for modname, data in self.modules.items():
+                self._add_short_names(modname, data)
+        return self._short_names
+
+    def _add_short_names(self, modname, data):
+        for name, lineno, kind in data[2]:
+            _add_entry(self._short_names, _short_name(name), (name, modname))
+
+    def _get_subclasses(self):
+        if self._subclasses is None:
+            self._subclasses = {}
+            for modname, data in self.modules.items():
+                self._add_subclasses(modname, data)
+        return self._subclasses
+
+    def _add_subclasses(self, modname, data):
+        for name, base_names in data[3]:
+            for base_name in base_names:
+                _add_entry(self._subclasses, base_name, (name, modname))
+
+    def _get_aliases(self):
+        if self._aliases is None:
+            self._aliases = {}
+            for modname, aliases in self.module_aliases.items():
+                self._add_aliases(modname, aliases)
+        return self._aliases
+
+    def _add_aliases(self, modname, aliases):
+        for alias, name in aliases:
+            _add_entry(self._aliases, name, (alias, modname))
+
+    def _is_fresh(self, resource):
+        modname = libutils.modname(resource)
+        # the aliases are missing in indexes written by older versions
+        if modname not in self.modules or \
+           modname not in self.module_aliases:
+            return False
+        path, stamp, definitions, bases = self.modules[modname]
+        return path == resource.path and stamp is not None and \
+            stamp == libutils.get_file_stamp(resource)
+
+    def _is_python_module(self, resource):
+        return not resource.is_folder() and \
+            self.project.pycore.is_python_file(resource)
+
+    def _update_stale(self, resource):
+        if self._stale is not None:
+            if resource.exists() and not self._is_fresh(resource):
+                self._stale.add(resource)
+            else:
+                self._stale.discard(resource)
+
+    def _changed(self, resource):
+        if self._is_python_module(resource):
+            if self.observe:
+                self.update_resource(resource)
+            self._update_stale(resource)
+
+    def _moved(self, resource, newresource):
+        if self._is_python_module(resource):
+            if self.observe:
+                self._remove_definitions(libutils.modname(resource))
+            self._update_stale(resource)
+        if self._is_python_module(newresource):
+            self._changed(newresource)
+
+    def _removed(self, resource):
+        if self._is_python_module(resource):
+            if self.observe:
+                self._remove_definitions(libutils.modname(resource))
+            self._update_stale(resource)
+
+
+def get_definitions(source, modname):
+    """Return the definitions of a module for `DefinitionIndex`
+
+    A list of ``(qualified name, lineno, kind)`` tuples is returned
+    for the names defined in the module-level statements of `source`
+    and in its class bodies.  Raises `SyntaxError` if `source` cannot
+    be parsed.
+
+    """
+    return _collect(source, modname).definitions
+
+
+def get_aliases(source):
+    """Return the aliases of a module for `DefinitionIndex`
+
+    A list of ``(alias, name)`` tuples is returned for the names
+    `source` assigns to or imports as other names, in any scope.
+    Raises `SyntaxError` if `source` cannot be parsed.
+
+    """
+    return _collect(source, '').bindings
+
+
+def _collect(source, modname):
+    collector = _DefinitionCollector(modname)
+    # like `AutoImport`, indexed trees are not shared
+    for node in ast.parse(source).body:
+        ast.walk(node, collector)
+    return collector
+
+
+def get_expression_at(code, offset):
+    """Return the dotted name at `offset` for `DefinitionIndex.find()`
+
+    The parts before the last call or subscription are dropped, so
+    ``a.b().c`` gives ``c``.
+    """
+    primary = worder.Worder(code).get_primary_at(offset)
+    match = _dotted_name.search(primary)
+    if match is None:
+        return None
+    return re.sub(r'\s+', '', match.group())
+
+
+_dotted_name = re.compile(r'\w+(\s*\.\s*\w+)*$')
+
+
+def _short_name(qualified_name):
+    return qualified_name.rpartition('.')[2]
+
+
+def _add_entry(entries, key, entry):
+    values = entries.setdefault(key, [])
+    if entry not in values:
+        values.append(entry)
+
+
+def _remove_entry(entries, key, entry):
+    values = entries.get(key, [])
+    if entry in values:
+        values.remove(entry)
+
+
+class _DefinitionCollector(object):
+
+    def __init__(self, prefix, aliases=None):
+        self.prefix = prefix
+        self.definitions = []
+        self.bases = []
+        self.bindings = []
+        self.indices = {}
+        self.aliases = aliases if aliases is not None else {}
+
+    def _ClassDef(self, node):
+        self._add(node.name, node.lineno, 'class')
+        qualified_name = self.prefix + '.' + node.name
+        base_names = []
+        for base in node.bases:
+            base_name = self._get_base_name(base)
+            if base_name not in base_names:
+                base_names.append(base_name)
+        self.bases.append((qualified_name, base_names))
+        collector = _DefinitionCollector(qualified_name, dict(self.aliases))
+        for child in node.body:
+            ast.walk(child, collector)
+        self.definitions.extend(collector.definitions)
+        self.bases.extend(collector.bases)
+        self.bindings.extend(collector.bindings)
+
+    def _get_base_name(self, node):
+        if isinstance(node, ast.Subscript):
+            return self._get_base_name(node.value)
+        if isinstance(node, ast.Attribute):
+            return node.attr
+        if isinstance(node, ast.Name):
+            return self.aliases.get(node.id, node.id)
+
+    def _FunctionDef(self, node):
+        self._add(node.name, node.lineno, 'function')
+        # the definitions in functions are not indexed but the bases
+        # of their classes are
+        collector = _DefinitionCollector(self.prefix + '.' + node.name,
+                                         dict(self.aliases))
+        for child in node.body:
+            ast.walk(child, collector)
+        self.bases.extend(collector.bases)
+        self.bindings.extend(collector.bindings)
+
+    def _AsyncFunctionDef(self, node):
+        self._FunctionDef(node)
+
+    def _Assign(self, node):
+        for target in node.targets:
+            for name, levels in astutils.get_name_levels(target):
+                self._add(name, node.lineno, 'variable')
+        if len(node.targets) == 1 and \
+           isinstance(node.targets[0], ast.Name) and \
+           isinstance(node.value, (ast.Name, ast.Attribute)):
+            self._add_alias(node.targets[0].id,
+                            self._get_base_name(node.value))
+
+    def _Import(self, node):
+        pass
+
+    def _ImportFrom(self, node):
+        for alias in node.names:
+            if alias.asname is not None:
+                self._add_alias(alias.asname, alias.name)
+
+    def _add_alias(self, alias, name):
+        self.aliases[alias] = name
+        if name is not None and alias != name and \
+           (alias, name) not in self.bindings:
+            self.bindings.append((alias, name))
+
+    def _add(self, name, lineno, kind):
+        # like `PyModule`, the last definition of a class or function
+        # and the first assignment of a variable is used
+        definition = (self.prefix + '.' + name, lineno, kind)
+        if name not in self.indices:
+            self.indices[name] = len(self.definitions)
+            self.definitions.append(definition)
+        elif kind != 'variable':
+            self.definitions[self.indices[name]] = definition
@@ -1,8 +1,8 @@
 import rope.base.codeanalyze
 import rope.base.evaluate
 import rope.base.pyobjects
-from rope.base import taskhandle, exceptions, worder
-from rope.contrib import fixsyntax
+from rope.base import taskhandle, exceptions, libutils, worder
+from rope.contrib import definitions, fixsyntax
 from rope.refactor import occurrences
 
 
@@ -36,11 +36,23 @@ def find_occurrences(project, resource, offset, unsure=False, resources=None,
 
 
 def find_implementations(project, resource, offset, resources=None,
-                         task_handle=taskhandle.NullTaskHandle()):
+                         task_handle=taskhandle.NullTaskHandle(),
+                         index=None):
     """Find the places a given method is overridden.
 
     Finds the places a method is implemented.  Returns a list of
     `Location`\s.
+
+    If `index` is a `rope.contrib.definitions.DefinitionIndex` and
+    `resources` is `None`, the modules that cannot define subclasses
+    of the method's class are skipped.  Subclasses are found by the
+    names of their base classes and the names bound to them, like
+    ``from mod import Class as Base``, in any module; the modules that
+    are not indexed or changed after being indexed and the classes
+    whose bases cannot be named, with their subclasses, are always
+    searched.  This is a
+    heuristic: the subclasses of names bound in other ways, like
+    ``Base = get_base()``, are missed.
     """
     name = worder.get_name_at(resource, offset)
     this_pymodule = project.get_pymodule(resource)
@@ -63,6 +75,8 @@ def find_implementations(project, resource, offset, resources=None,
     filters = [is_defined, not_self,
                occurrences.InHierarchyFilter(pyname, True)]
     finder = occurrences.Finder(project, name, filters=filters)
+    if resources is None and index is not None:
+        resources = _find_subclass_modules(index, pyobject.parent.get_name())
     if resources is None:
         resources = project.get_python_files()
     job_set = task_handle.create_jobset('Finding Implementations',
@@ -70,17 +84,59 @@ def find_implementations(project, resource, offset, resources=None,
     return _find_locations(finder, resources, job_set)
 
 
-def find_definition(project, code, offset, resource=None, maxfixes=1):
+def _find_subclass_modules(index, classname):
+    result = index.get_stale_resources()
+    # the classes of stale modules might subclass any class
+    classes = index.get_classes_with_unknown_bases()
+    stale_aliases = {}
+    for resource in result:
+        try:
+            source = resource.read_bytes()
+            classes.extend(
+                (name, resource) for name, lineno, kind in
+                definitions.get_definitions(source,
+                                            libutils.modname(resource))
+                if kind == 'class')
+            for alias, name in definitions.get_aliases(source):
+                stale_aliases.setdefault(name, []).append((alias, resource))
+        except SyntaxError:
+            pass
+    classnames = [classname]
+    visited = set(classnames)
+    while classnames:
+        name = classnames.pop()
+        classes.extend(index.get_subclasses(name))
+        # subclasses might name the class by its aliases in any module
+        classes.extend(index.get_aliases(name))
+        classes.extend(stale_aliases.get(name, []))
+        while classes:
+            name, resource = classes.pop()
+            if resource not in result:
+                result.append(resource)
+            subclassname = name.rpartition('.')[2]
+            if subclassname not in visited:
+                visited.add(subclassname)
+                classnames.append(subclassname)
+    return result
+
+
+def find_definition(project, code, offset, resource=None, maxfixes=1,
+                    index=None):
     """Return the definition location of the python name at `offset`
 
     A `Location` object is returned if the definition location can be
     determined, otherwise ``None`` is returned.
+
+    If the name cannot be resolved and `index` is a
+    `rope.contrib.definitions.DefinitionIndex`, the name is looked up
+    in it instead; a location is returned only if there is exactly
+    one candidate.
     """
     fixer = fixsyntax.FixSyntax(project, code, resource, maxfixes)
     pyname = fixer.pyname_at(offset)
+    name = rope.base.worder.Worder(code).get_word_at(offset)
     if pyname is not None:
         module, lineno = pyname.get_definition_location()
-        name = rope.base.worder.Worder(code).get_word_at(offset)
         if lineno is not None:
             start = module.lines.get_line_start(lineno)
 
@@ -92,6 +148,18 @@ def find_definition(project, code, offset, resource=None, maxfixes=1):
                                         [check_offset, pyname_filter])
             for occurrence in finder.find_occurrences(pymodule=module):
                 return Location(occurrence)
+    elif index is not None:
+        expression = definitions.get_expression_at(code, offset)
+        candidates = index.find(expression) if expression else []
+        if len(candidates) == 1:
+            qualified_name, resource, lineno, kind = candidates[0]
+
+            def check_line(occurrence):
+                if occurrence.lineno == lineno:
+                    return True
+            finder = occurrences.Finder(project, name, [check_line])
+            for occurrence in finder.find_occurrences(resource):
+                return Location(occurrence)
 
 
 class Location(object):
@@ -1,3 +1,7 @@
+import re
+import tokenize
+
+import rope.base.ast
 import rope.base.codeanalyze
 import rope.base.evaluate
 from rope.base import exceptions
@@ -5,6 +9,7 @@ from rope.base import libutils
 from rope.base import utils
 from rope.base import worder
 from rope.base.codeanalyze import ArrayLinesAdapter, LogicalLineFinder
+from rope.base.utils import pycompat
 
 
 class FixSyntax(object):
@@ -21,6 +26,9 @@ class FixSyntax(object):
         msg = None
         code = self.code
         tries = 0
+        # guessing needs at least two fixes to save a parse
+        guessing = self.maxfixes > 1
+        guessed = None
         while True:
             try:
                 if tries == 0 and self.resource is not None and \
@@ -33,20 +41,82 @@ class FixSyntax(object):
             except exceptions.ModuleSyntaxError as e:
                 if msg is None:
                     msg = '%s:%s %s' % (e.filename, e.lineno, e.message_)
-                if tries < self.maxfixes:
+                if guessed is not None:
+                    # the guessed errors did not fix the module; fixing
+                    # the errors the module reports one by one instead
+                    tries, state = guessed
+                    self.commenter.set_state(state)
+                    code = '\n'.join(self.commenter.lines)
+                    guessing = False
+                    guessed = None
+                elif tries < self.maxfixes:
                     tries += 1
                     self.commenter.comment(e.lineno)
+                    if guessing:
+                        guessed = self._fix_statement_errors(e.lineno, tries)
                     code = '\n'.join(self.commenter.lines)
                 else:
                     raise exceptions.ModuleSyntaxError(
                         e.filename, e.lineno,
                         'Failed to fix error: {0}'.format(msg))
 
+    def _fix_statement_errors(self, lineno, tries):
+        """Fix the other errors of the statement containing `lineno`
+
+        The errors are guessed by parsing the statement alone, without
+        parsing the whole module after each fix.  If an error was
+        fixed, returns the number of tries and the state of the
+        commenter before the guessed fixes, for going back to them if
+        the module still has errors; otherwise returns `None`.
+
+        """
+        state = self.commenter.get_state()
+        guesses = 0
+        try:
+            lineno = self._find_statement_error(lineno)
+            while lineno is not None and tries + guesses < self.maxfixes:
+                guesses += 1
+                self.commenter.comment(lineno)
+                lineno = self._find_statement_error(lineno)
+        except (SyntaxError, tokenize.TokenError):
+            # tokenizing the guessed lines might fail
+            self.commenter.set_state(state)
+            return None
+        if guesses:
+            return tries, state
+
+    def _find_statement_error(self, lineno):
+        """Guess the line of the first error of a top-level statement
+
+        The top-level statement that contains `lineno` is parsed
+        alone.  Its first error is usually the next error of the
+        module, but not always; for instance when the statement is
+        inside a triple-quoted string.  `None` is returned if the
+        statement has no errors or if it cannot tell.
+
+        """
+        # ``print_function`` future imports change python 2 syntax
+        if pycompat.PY2 and 'print_function' in self._future_imports:
+            return None
+        lines = self.commenter.lines
+        start, end = _get_statement_region(lines, lineno)
+        try:
+            rope.base.ast.parse('\n'.join(lines[start - 1:end - 1]))
+        except SyntaxError as e:
+            if e.lineno is not None:
+                return start + e.lineno - 1
+        return None
+
     @property
     @utils.saveit
     def commenter(self):
         return _Commenter(self.code)
 
+    @property
+    @utils.saveit
+    def _future_imports(self):
+        return _get_future_imports(self.code.split('\n'))
+
     def pyname_at(self, offset):
         pymodule = self.get_pymodule()
 
@@ -79,6 +149,14 @@ class _Commenter(object):
         self.origs = list(range(len(self.lines) + 1))
         self.diffs = [0] * (len(self.lines) + 1)
 
+    def get_state(self):
+        return list(self.lines), list(self.origs), list(self.diffs)
+
+    def set_state(self, state):
+        lines, origs, diffs = state
+        self.lines, self.origs, self.diffs = \
+            list(lines), list(origs), list(diffs)
+
     def comment(self, lineno):
         start = _logical_start(self.lines, lineno, check_prev=True) - 1
         # using self._get_stmt_end() instead of self._get_block_end()
@@ -163,6 +241,65 @@ class _Commenter(object):
         self.lines.insert(lineno, line)
 
 
+def _get_statement_region(lines, lineno):
+    """Return the lines of the top-level statement containing `lineno`
+
+    The returned ``(start, end)`` line numbers include `start` and
+    exclude `end`.
+
+    """
+    logical_finder = LogicalLineFinder(ArrayLinesAdapter(lines))
+
+    def is_statement_start(lineno):
+        line = lines[lineno - 1]
+        if line.strip() == '' or line[0] in ' \t#' or \
+           _continued_blocks.match(line):
+            return False
+        prev = lineno - 1
+        while prev > 0 and lines[prev - 1].strip()[:1] in ('', '#'):
+            prev -= 1
+        if prev > 0 and lines[prev - 1].startswith('@'):
+            return False
+        return logical_finder.logical_line_in(lineno)[0] == lineno
+    start = lineno
+    while start > 1 and not is_statement_start(start):
+        start -= 1
+    end = lineno + 1
+    while end <= len(lines) and not is_statement_start(end):
+        end += 1
+    return start, end
+
+
+_continued_blocks = re.compile(r'(else|elif|except|finally)\b')
+
+
+def _get_future_imports(lines):
+    """Return the names imported from ``__future__`` in `lines`
+
+    Future imports can only follow the docstring of the module, so
+    the top-level statements are parsed one by one until a statement
+    that is neither of them.
+
+    """
+    result = set()
+    lineno = 1
+    while lineno <= len(lines):
+        start, end = _get_statement_region(lines, lineno)
+        try:
+            node = rope.base.ast.parse('\n'.join(lines[start - 1:end - 1]))
+        except SyntaxError:
+            break
+        for stmt in node.body:
+            if isinstance(stmt, rope.base.ast.ImportFrom) and \
+               stmt.module == '__future__':
+                result.update(alias.name for alias in stmt.names)
+            elif not (isinstance(stmt, rope.base.ast.Expr) and
+                      isinstance(stmt.value, rope.base.ast.Str)):
+                return result
+        lineno = end
+    return result
+
+
 def _logical_start(lines, lineno, check_prev=False):
     logical_finder = LogicalLineFinder(ArrayLinesAdapter(lines))
     if check_prev:
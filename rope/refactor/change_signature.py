@@ -57,7 +57,8 @@ class ChangeSignature(object):
             name, pyname = self.others
             constructor_finder = occurrences.create_finder(
                 self.project, name, pyname, only_calls=True)
-            finder = _MultipleFinders([finder, constructor_finder])
+            finder = occurrences.MultiFinder(
+                self.project, [finder, constructor_finder])
         for file in resources:
             job_set.started_job(file.path)
             change_calls = _ChangeCallsInModule(
@@ -336,17 +337,3 @@ class _ChangeCallsInModule(object):
     @utils.saveit
     def lines(self):
         return self.pymodule.lines
-
-
-class _MultipleFinders(object):
-
-    def __init__(self, finders):
-        self.finders = finders
-
-    def find_occurrences(self, resource=None, pymodule=None):
-        all_occurrences = []
-        for finder in self.finders:
-            all_occurrences.extend(finder.find_occurrences(resource, pymodule))
-        all_occurrences.sort(key=lambda x: x.get_primary_range())
-        return all_occurrences
-
@@ -9,6 +9,9 @@ a `Finder` object, use the `create_finder()` function:
     for occurrence in finder.find_occurrences():
         pass
 
+`MultiFinder` can be used to find the occurrences of the names of
+several `Finder`\s while scanning each file only once.
+
 It's possible to filter the occurrences. They can be specified when
 calling the `create_finder()` function.
 
@@ -35,13 +38,14 @@ calling the `create_finder()` function.
     arguments
 """
 
+import bisect
 import re
 
-from rope.base import codeanalyze
 from rope.base import evaluate
 from rope.base import exceptions
 from rope.base import pynames
 from rope.base import pyobjects
+from rope.base import simplify
 from rope.base import utils
 from rope.base import worder
 
@@ -74,13 +78,61 @@ class Finder(object):
                                         pymodule=pymodule, docs=self.docs)
         for offset in self._textual_finder.find_offsets(tools.source_code):
             occurrence = Occurrence(tools, offset)
-            for filter in self.filters:
-                result = filter(occurrence)
-                if result is None:
-                    continue
-                if result:
+            if self._is_accepted(occurrence):
+                yield occurrence
+
+    def _is_accepted(self, occurrence):
+        for filter in self.filters:
+            result = filter(occurrence)
+            if result is None:
+                continue
+            return bool(result)
+        return False
+
+
+class MultiFinder(object):
+    """For finding occurrences of several names at once
+
+    It takes a list of `Finder` objects and scans each source only once
+    for all of their names.  Each match is checked against the filters
+    of the finders of the matched name and `find_occurrences()`
+    generates the accepted occurrences in the order they appear.
+    Use the `finder` attribute of yielded occurrences to tell which
+    finder accepted them.
+
+    """
+
+    def __init__(self, project, finders):
+        self.project = project
+        self.finders = finders
+        self.docs = any(finder.docs for finder in finders)
+        self._finders_by_name = {}
+        for finder in finders:
+            self._finders_by_name.setdefault(finder.name, []).append(finder)
+        self.pattern = re.compile(
+            '\\b(?:' + '|'.join(self._finders_by_name) + ')\\b')
+
+    def find_occurrences(self, resource=None, pymodule=None):
+        """Generate `Occurrence` instances"""
+        tools = _OccurrenceToolsCreator(self.project, resource=resource,
+                                        pymodule=pymodule, docs=self.docs)
+        source = tools.source_code
+        if not any(name in source for name in self._finders_by_name):
+            return
+        ignores = None
+        for match in self.pattern.finditer(source):
+            offset = match.start()
+            occurrence = Occurrence(tools, offset)
+            for finder in self._finders_by_name[match.group()]:
+                if not finder.docs:
+                    if ignores is None:
+                        ignores = _IgnoredRegions(source)
+                    if offset in ignores:
+                        continue
+                if finder._is_accepted(occurrence):
+                    occurrence.finder = finder
                     yield occurrence
-                break
+                    break
 
 
 def create_finder(project, name, pyname, only_calls=False, imports=True,
@@ -297,9 +349,6 @@ class _TextualFinder(object):
     def __init__(self, name, docs=False):
         self.name = name
         self.docs = docs
-        self.comment_pattern = _TextualFinder.any('comment', [r'#[^\n]*'])
-        self.string_pattern = _TextualFinder.any(
-            'string', [codeanalyze.get_string_pattern()])
         self.pattern = self._get_occurrence_pattern(self.name)
 
     def find_offsets(self, source):
@@ -313,10 +362,11 @@ class _TextualFinder(object):
             yield matched
 
     def _re_search(self, source):
+        ignores = _IgnoredRegions(source)
         for match in self.pattern.finditer(source):
-            for key, value in match.groupdict().items():
-                if value and key == 'occurrence':
-                    yield match.start(key)
+            offset = match.start()
+            if offset not in ignores:
+                yield offset
 
     def _normal_search(self, source):
         current = 0
@@ -349,15 +399,23 @@ class _TextualFinder(object):
             return pymodule.source_code
 
     def _get_occurrence_pattern(self, name):
-        occurrence_pattern = _TextualFinder.any('occurrence',
-                                                ['\\b' + name + '\\b'])
-        pattern = re.compile(occurrence_pattern + '|' + self.comment_pattern +
-                             '|' + self.string_pattern)
-        return pattern
-
-    @staticmethod
-    def any(name, list_):
-        return '(?P<%s>' % name + '|'.join(list_) + ')'
+        return re.compile('\\b' + name + '\\b')
+
+
+class _IgnoredRegions(object):
+    """Strings and comments of a source
+
+    `simplify.ignored_regions()` is cached per source and is shared
+    with the worders created for the same code.
+    """
+
+    def __init__(self, source):
+        self.regions = simplify.ignored_regions(source)
+        self.starts = [start for start, end in self.regions]
+
+    def __contains__(self, offset):
+        index = bisect.bisect(self.starts, offset)
+        return index > 0 and offset < self.regions[index - 1][1]
 
 
 class _OccurrenceToolsCreator(object):
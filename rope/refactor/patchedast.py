@@ -17,7 +17,7 @@ def get_patched_ast(source, sorted_children=False):
     Adds ``sorted_children`` field only if `sorted_children` is True.
 
     """
-    return patch_ast(ast.parse(source), source, sorted_children)
+    return patch_ast(ast.parse_shared(source), source, sorted_children)
 
 
 def patch_ast(node, source, sorted_children=False):
@@ -32,8 +32,13 @@ def patch_ast(node, source, sorted_children=False):
     nodes as well as whitespaces and comments that occur between
     them.
 
+    Nodes that are already patched are not patched again; `node`
+    may be shared between the users of `source` (see
+    `rope.base.ast.parse_shared()`).
+
     """
-    if hasattr(node, 'region'):
+    if hasattr(node, 'region') and \
+            (not sorted_children or hasattr(node, 'sorted_children')):
         return node
     walker = _PatchingASTWalker(source, children=sorted_children)
     ast.call_for_nodes(node, walker)
@@ -88,7 +93,8 @@ class _PatchingASTWalker(object):
             node.sorted_children = ast.get_children(node)
 
     def _handle(self, node, base_children, eat_parens=False, eat_spaces=False):
-        if hasattr(node, 'region'):
+        if hasattr(node, 'region') and \
+                (not self.children or hasattr(node, 'sorted_children')):
             # ???: The same node was seen twice; what should we do?
             warnings.warn(
                 'Node <%s> has been already patched; please report!' %
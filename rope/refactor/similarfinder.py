@@ -70,7 +70,7 @@ class RawSimilarFinder(object):
 
     def __init__(self, source, node=None, does_match=None):
         if node is None:
-            node = ast.parse(source)
+            node = ast.parse_shared(source)
         if does_match is None:
             self.does_match = self._simple_does_match
         else:
@@ -1,3 +1,4 @@
+import os
 try:
     import unittest2 as unittest
 except ImportError:
@@ -5,6 +6,7 @@ except ImportError:
 
 import rope.base.libutils
 import rope.base.oi
+import rope.base.oi.soa
 from rope.base.utils import pycompat
 from ropetest import testutils
 
@@ -30,6 +32,36 @@ class DynamicOITest(unittest.TestCase):
         self.assertEquals(pymod['a_func'].get_object(),
                           pymod['a_var'].get_object())
 
+    def test_dti_when_the_module_calls_sys_exit(self):
+        mod = testutils.create_module(self.project, 'mod')
+        code = 'import sys\ndef a_func(arg):\n    return eval("arg")\n' \
+               'a_var = a_func(a_func)\nsys.exit(0)\n'
+        mod.write(code)
+        self.pycore.run_module(mod).wait_process()
+        pymod = self.project.get_pymodule(mod)
+        self.assertEquals(pymod['a_func'].get_object(),
+                          pymod['a_var'].get_object())
+
+    def test_dti_when_the_module_calls_os_exit(self):
+        mod = testutils.create_module(self.project, 'mod')
+        code = 'import os\nimport time\n' \
+               'def a_func(arg):\n    return eval("arg")\n' \
+               'a_var = a_func(a_func)\ntime.sleep(0.3)\n' \
+               'another_var = a_func(1)\nos._exit(0)\n'
+        mod.write(code)
+        self.pycore.run_module(mod).wait_process()
+        pymod = self.project.get_pymodule(mod)
+        self.assertEquals(pymod['a_func'].get_object(),
+                          pymod['a_var'].get_object())
+
+    @testutils.skipNotPOSIX()
+    def test_removing_socket_folders_of_killed_processes(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('import time\ntime.sleep(10)\n')
+        runner = self.pycore.run_module(mod)
+        runner.kill_process()
+        self.assertFalse(os.path.exists(runner.receiver.folder))
+
     def test_module_dti(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod2 = testutils.create_module(self.project, 'mod2')
@@ -352,6 +384,57 @@ class DynamicOITest(unittest.TestCase):
         self.assertEquals(pymod2['C'].get_object(),
                           pymod['a_var'].get_object())
 
+    def test_running_modules_in_parallel(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        code = 'def a_func(arg):\n    return eval("arg")\n' \
+               'a_var = a_func(a_func)\n'
+        mod1.write(code)
+        mod2.write(code)
+        runners = self.pycore.run_modules([mod1, mod2], jobs=1)
+        self.assertEquals([0, 0], [runner.process.returncode
+                                   for runner in runners])
+        for mod in (mod1, mod2):
+            pymod = self.project.get_pymodule(mod)
+            self.assertEquals(pymod['a_func'].get_object(),
+                              pymod['a_var'].get_object())
+
+    def test_starting_modules_when_any_running_module_finishes(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        flag = os.path.join(self.project.address, 'flag')
+        mod1.write('import os, sys, time\n'
+                   'for i in range(500):\n'
+                   '    if os.path.exists(%r):\n'
+                   '        sys.exit(0)\n'
+                   '    time.sleep(0.02)\n'
+                   'sys.exit(1)\n' % flag)
+        mod3.write('open(%r, "w").close()\n' % flag)
+        runners = self.pycore.run_modules([mod1, mod2, mod3], jobs=2)
+        self.assertEquals([0, 0, 0], [runner.process.returncode
+                                      for runner in runners])
+
+
+class ProfilingDynamicOITest(DynamicOITest):
+
+    def setUp(self):
+        super(ProfilingDynamicOITest, self).setUp()
+        self.project.prefs['doa_tracer'] = 'profile'
+
+    def test_sampling_calls(self):
+        self.project.prefs['doa_sampling'] = 2
+        mod = testutils.create_module(self.project, 'mod')
+        code = 'class C1(object):\n    pass\n' \
+               'class C2(object):\n    pass\n' \
+               'def a_func(arg):\n    return eval("arg")\n' \
+               'a_func(C1)\na_var = a_func(C2)\n'
+        mod.write(code)
+        self.pycore.run_module(mod).wait_process()
+        pymod = self.project.get_pymodule(mod)
+        self.assertEquals(pymod['C1'].get_object(),
+                          pymod['a_var'].get_object())
+
 
 class NewStaticOITest(unittest.TestCase):
 
@@ -697,6 +780,95 @@ class NewStaticOITest(unittest.TestCase):
         p_type = f_scope['p'].get_object().get_type()
         self.assertEquals(c_class, p_type)
 
+    def test_analyzing_modules_in_the_order_of_their_imports(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        pkg = testutils.create_package(self.project, 'pkg')
+        mod3 = testutils.create_module(self.project, 'mod3', pkg)
+        mod4 = testutils.create_module(self.project, 'mod4', pkg)
+        mod2.write('import mod1\n')
+        mod3.write('from . import mod4\nimport mod2\n')
+        mod4.write('from pkg import mod3\n')
+        layers = rope.base.oi.soa.dependency_layers(
+            self.pycore, [mod4, mod3, mod2, mod1])
+        self.assertEquals([[mod1], [mod2], [mod4, mod3]], layers)
+
+    def test_layers_of_modules_importing_import_cycles(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod4 = testutils.create_module(self.project, 'mod4')
+        mod1.write('import mod2\n')
+        mod2.write('import mod1\n')
+        mod3.write('import mod1\n')
+        mod4.write('import mod3\nimport mod2\n')
+        layers = rope.base.oi.soa.dependency_layers(
+            self.pycore, [mod4, mod3, mod2, mod1])
+        self.assertEquals([[mod2, mod1], [mod3], [mod4]], layers)
+
+    def test_analyzing_modules_together(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('def f(p):\n    return p\n')
+        mod2.write('import mod1\n\nclass C(object):\n    pass\n'
+                   'mod1.f(C())\n')
+        self.pycore.analyze_modules([mod2, mod1])
+        pymod1 = self.project.get_pymodule(mod1)
+        pymod2 = self.project.get_pymodule(mod2)
+        c_class = pymod2['C'].get_object()
+        p_type = pymod1['f'].get_object().get_scope()['p'].\
+            get_object().get_type()
+        self.assertEquals(c_class, p_type)
+
+    def _get_stale_scopes(self, *resources):
+        fingerprints = {}
+        for resource in resources:
+            pymodule = self.project.get_pymodule(resource)
+            fingerprints.update(rope.base.oi.soa.get_fingerprints(pymodule))
+        return self.pycore.object_info.get_stale_scopes(fingerprints)
+
+    def test_analyzing_stale_scopes(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('def f(p):\n    return p\n')
+        mod2.write('import mod1\n\nclass C(object):\n    pass\n\n'
+                   'def g():\n    return mod1.f(C())\n')
+        self.assertEquals(5, len(self._get_stale_scopes(mod1, mod2)))
+        self.pycore.analyze_stale_scopes([mod1, mod2])
+        self.assertEquals([], self._get_stale_scopes(mod1, mod2))
+        pymod1 = self.project.get_pymodule(mod1)
+        pymod2 = self.project.get_pymodule(mod2)
+        p_type = pymod1['f'].get_object().get_scope()['p'].\
+            get_object().get_type()
+        self.assertEquals(pymod2['C'].get_object(), p_type)
+
+    def test_storing_fingerprints_only_for_scopes_with_call_infos(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('def f(p):\n    return p\n')
+        mod2.write('import mod1\n\nclass C(object):\n    pass\n\n'
+                   'def g():\n    return mod1.f(C())\n')
+        self.pycore.analyze_stale_scopes([mod1, mod2])
+        objectdb = self.pycore.object_info.objectdb
+        self.assertEquals(['f'], list(objectdb.files['mod1.py']))
+        self.assertFalse('mod2.py' in objectdb.files)
+        self.assertNotEquals(None, objectdb.get_fingerprint('mod1.py', 'f')[0])
+
+    def test_stale_scopes_after_changing_called_functions(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('def f(p):\n    return p\n')
+        mod2.write('import mod1\n\nclass C(object):\n    pass\n\n'
+                   'def g():\n    return mod1.f(C())\n')
+        self.pycore.analyze_stale_scopes([mod1, mod2])
+        mod1.write('def f(p):\n    return [p]\n')
+        self.pycore.analyze_module(mod1)
+        pymod2 = self.project.get_pymodule(mod2)
+        self.assertEquals([pymod2['g'].get_object()],
+                          self._get_stale_scopes(mod1, mod2))
+        self.pycore.analyze_stale_scopes([mod1, mod2])
+        self.assertEquals([], self._get_stale_scopes(mod1, mod2))
+
     def test_validation_problems_for_objectdb_retrievals(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod2 = testutils.create_module(self.project, 'mod2')
@@ -752,6 +924,7 @@ class NewStaticOITest(unittest.TestCase):
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(DynamicOITest))
+    result.addTests(unittest.makeSuite(ProfilingDynamicOITest))
     result.addTests(unittest.makeSuite(NewStaticOITest))
     return result
 
@@ -7,6 +7,7 @@ except ImportError:
 import ropetest.contrib.autoimporttest
 import ropetest.contrib.changestacktest
 import ropetest.contrib.codeassisttest
+import ropetest.contrib.definitionstest
 import ropetest.contrib.finderrorstest
 import ropetest.contrib.findittest
 import ropetest.contrib.fixmodnamestest
@@ -20,6 +21,7 @@ def suite():
     result.addTests(ropetest.contrib.codeassisttest.suite())
     result.addTests(ropetest.contrib.autoimporttest.suite())
     result.addTests(ropetest.contrib.findittest.suite())
+    result.addTests(ropetest.contrib.definitionstest.suite())
     result.addTests(unittest.makeSuite(ropetest.contrib.changestacktest.
                                        ChangeStackTest))
     result.addTests(unittest.makeSuite(ropetest.contrib.fixmodnamestest.
@@ -1,3 +1,4 @@
+import os
 try:
     import unittest2 as unittest
 except ImportError:
@@ -63,6 +64,31 @@ class AutoImportTest(unittest.TestCase):
         self.assertEquals(set(['mod1', 'pkg.mod2']),
                           set(self.importer.get_modules('myvar')))
 
+    def test_import_assist_with_several_modules(self):
+        self.mod1.write('myvar = None\nmyfunc = None\nother = None\n')
+        self.mod2.write('myvar = None\n')
+        self.importer.update_resource(self.mod1)
+        self.importer.update_resource(self.mod2)
+        self.assertEquals(
+            [('myfunc', 'mod1'), ('myvar', 'mod1'), ('myvar', 'pkg.mod2')],
+            self.importer.import_assist('my'))
+
+    def test_iterating_import_assist(self):
+        self.mod1.write('myvar1 = None\nmyvar2 = None\n')
+        self.importer.update_resource(self.mod1)
+        proposals = self.importer.iter_import_assist('myvar')
+        self.assertEquals(('myvar1', 'mod1'), next(proposals))
+
+    def test_updating_resources_with_changed_names(self):
+        self.mod1.write('myvar = None\n')
+        self.importer.update_resource(self.mod1)
+        self.assertEquals(['mod1'], self.importer.get_modules('myvar'))
+        self.mod1.write('myothervar = None\n')
+        self.importer.update_resource(self.mod1)
+        self.assertEquals([], self.importer.get_modules('myvar'))
+        self.assertEquals([('myothervar', 'mod1')],
+                          self.importer.import_assist('my'))
+
     def test_trivial_insertion_line(self):
         result = self.importer.find_insertion_line('')
         self.assertEquals(1, result)
@@ -124,6 +150,73 @@ class AutoImportTest(unittest.TestCase):
         self.importer.update_module('sys')
         self.assertTrue('sys' in self.importer.get_modules('exit'))
 
+    def test_generating_cache_in_parallel(self):
+        self.mod1.write('myvar = None\n')
+        self.mod2.write('def myfunc():\n    pass\nthis is an error\n')
+        self.importer.generate_cache(jobs=2)
+        self.assertEquals([('myvar', 'mod1')],
+                          self.importer.import_assist('my'))
+
+    def test_generating_modules_cache_in_parallel(self):
+        self.mod1.write('myvar = None\n')
+        self.mod2.write('import sys\ndef myfunc():\n    pass\n')
+        self.importer.generate_modules_cache(['mod1', 'pkg.*', 'sys'],
+                                             jobs=2)
+        self.assertEquals([('myfunc', 'pkg.mod2'), ('myvar', 'mod1')],
+                          self.importer.import_assist('my'))
+        self.assertTrue('sys' in self.importer.get_modules('exit'))
+
+    def test_not_scanning_unchanged_modules_again(self):
+        self.mod1.write('myvar = None\n')
+        os.utime(self.mod1.real_path, (1000000000, 1000000000))
+        self.importer.generate_modules_cache(['mod1'])
+        self.mod1.write('myvaz = None\n')
+        os.utime(self.mod1.real_path, (1000000000, 1000000000))
+        self.importer.generate_modules_cache(['mod1'])
+        self.assertEquals(['myvar'], self.importer.names['mod1'])
+        os.utime(self.mod1.real_path, (1000000001, 1000000001))
+        self.importer.generate_modules_cache(['mod1'])
+        self.assertEquals(['myvaz'], self.importer.names['mod1'])
+
+    def test_scanning_modules_again_for_underlined_names(self):
+        self.mod1.write('_myvar = None\n')
+        self.importer.generate_modules_cache(['mod1'])
+        self.importer.generate_modules_cache(['mod1'], underlined=True)
+        self.assertEquals(['_myvar'], self.importer.names['mod1'])
+
+    def test_reading_the_saved_cache(self):
+        self.mod1.write('myvar = None\n')
+        os.utime(self.mod1.real_path, (1000000000, 1000000000))
+        self.importer.generate_cache()
+        self.project.sync()
+        self.mod1.write('myvaz = None\n')
+        os.utime(self.mod1.real_path, (1000000000, 1000000000))
+        importer = autoimport.AutoImport(self.project, observe=False)
+        importer.generate_cache()
+        self.assertEquals(['mod1'], importer.get_modules('myvar'))
+
+    def test_update_module_for_packages(self):
+        init = self.pkg.get_child('__init__.py')
+        init.write('import sys\ntry:\n    myvar = 1\nexcept ImportError:\n'
+                   '    myvar = None\n')
+        self.importer.update_module('pkg')
+        self.assertEquals([('myvar', 'pkg')],
+                          self.importer.import_assist('my'))
+
+    def test_update_resource_with_encoding_declarations(self):
+        self.mod1.write(u'# -*- coding: latin-1 -*-\nmyvar = "\xe9"\n')
+        self.importer.update_resource(self.mod1)
+        self.assertEquals(['mod1'], self.importer.get_modules('myvar'))
+
+    def test_global_names(self):
+        code = 'import a.b\nfrom c import d, e as f\nimport g\ng = 1\n' \
+               'h, (i, j) = k\ndef l():\n    m = 1\nclass N(object):\n' \
+               '    o = 1\nif p:\n    q = 1\nelse:\n    for r in s:\n' \
+               '        pass\n_t = 1\nl = 1\n'
+        self.assertEquals(['N', 'h', 'i', 'j', 'l', 'q', 'r'],
+                          sorted(autoimport.get_global_names(code)))
+        self.assertTrue('_t' in autoimport.get_global_names(code, True))
+
     def test_submodules(self):
         self.assertEquals(set([self.mod1]),
                           autoimport.submodules(self.mod1))
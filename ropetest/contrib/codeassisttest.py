@@ -7,10 +7,14 @@ except ImportError:
     import unittest
 
 from rope.base import exceptions
+from rope.contrib import definitions
+from rope.contrib import fixsyntax
 from rope.contrib.codeassist import (get_definition_location, get_doc,
                                      starting_expression, code_assist,
                                      sorted_proposals, starting_offset,
-                                     get_calltip, get_canonical_path)
+                                     get_calltip, get_canonical_path,
+                                     CompletionCache, iter_sorted_proposals,
+                                     warm_up, WarmUp)
 from ropetest import testutils
 
 try:
@@ -103,6 +107,44 @@ class CodeAssistTest(unittest.TestCase):
         result = self._assist(code, maxfixes=2)
         self.assertTrue(len(result) > 0)
 
+    def test_fixing_several_errors_in_one_statement(self):
+        code = 'def f():\n    sldj sldj\n    sdf sdf\nmy_var = 1\nmy_'
+        result = self._assist(code, maxfixes=2)
+        self.assert_completion_in_result('my_var', 'global', result)
+        with self.assertRaises(exceptions.ModuleSyntaxError):
+            self._assist(code, maxfixes=1)
+
+    def test_fixing_errors_when_statements_are_guessed_wrong(self):
+        code = 'class C(object):\n' \
+               '        self.finder = occurrences.create_finder(\n' \
+               '            self.project, self.pyfunction, body=body)\n' \
+               '        """Get the changes this refactoring makes\n' \
+               'class D(object):\n' \
+               '        """Inlines occurrences\n' \
+               '        """\n'
+        fixer = fixsyntax.FixSyntax(self.project, code, None, maxfixes=3)
+        self.assertTrue('C' in fixer.get_pymodule())
+
+    def test_future_imports_for_fixing_errors(self):
+        lines = ['"""print_function"""', '# print_function',
+                 'from __future__ import (division,', '    absolute_import)',
+                 'x = "print_function"', 'from __future__ import nested',
+                 'def f(:']
+        self.assertEquals(set(['division', 'absolute_import']),
+                          fixsyntax._get_future_imports(lines))
+        lines = ['from __future__ import print_function', 'print(1']
+        self.assertEquals(set(['print_function']),
+                          fixsyntax._get_future_imports(lines))
+
+    def test_statement_regions_for_fixing_errors(self):
+        lines = ['import os', '@decorator', '', 'def f(a,', 'b):',
+                 '    pass', 'if True:', '    pass', 'else:', '    pass',
+                 'x = 1']
+        self.assertEquals((2, 7),
+                          fixsyntax._get_statement_region(lines, 5))
+        self.assertEquals((7, 11),
+                          fixsyntax._get_statement_region(lines, 9))
+
     def test_ignoring_errors_in_current_line(self):
         code = 'def my_func():\n    return 2\nt = '
         result = self._assist(code)
@@ -452,6 +494,18 @@ class CodeAssistTest(unittest.TestCase):
         self.assertEquals('my_b_func', proposals[0].name)
         self.assertEquals('my_a_var', proposals[1].name)
 
+    def test_iterating_sorted_proposals(self):
+        code = 'def my_b_func(self):\n' + \
+               '    my_c_var = 1\n' + \
+               '    my_\n' + \
+               'my_a_var = 10\n' + \
+               'my__d_var = 10\n'
+        proposals = iter_sorted_proposals(
+            self._assist(code, code.index('my_\n') + 3))
+        self.assertEquals('my_c_var', next(proposals).name)
+        self.assertEquals(['my_a_var', 'my_b_func', 'my__d_var'],
+                          [proposal.name for proposal in proposals])
+
     def test_proposals_sorter_underlined_methods(self):
         code = 'class A(object):\n' + \
                '    def _my_func(self):\n' + \
@@ -944,6 +998,111 @@ class CodeAssistInProjectsTest(unittest.TestCase):
             if proposal.name == name and proposal.scope == scope:
                 self.fail('completion <%s> was proposed' % name)
 
+    def test_narrowing_cached_completions(self):
+        cache = CompletionCache(self.project)
+        code = 'import samplemod\nsamplemod.sample_%s\nprint(1)\n'
+        offset = len('import samplemod\nsamplemod.sample_')
+        result = code_assist(self.project, code % '', offset, cache=cache)
+        self.assertEquals(2, len(result))
+        narrowed = code_assist(self.project, code % 'v', offset + 1,
+                               cache=cache)
+        self.assertEquals(['sample_var'], [p.name for p in narrowed])
+        self.assertTrue(narrowed[0] in result)
+
+    def test_keywords_in_completions_narrowed_from_empty_names(self):
+        cache = CompletionCache(self.project)
+        code = 'import samplemod\n'
+        code_assist(self.project, code, len(code), cache=cache)
+        code += 'i'
+        result = code_assist(self.project, code, len(code), cache=cache)
+        self.assert_completion_in_result('if', 'keyword', result)
+        self.assert_completion_in_result('import', 'keyword', result)
+
+    def test_not_reusing_cached_completions_after_other_edits(self):
+        cache = CompletionCache(self.project)
+        code = 'import samplemod\nsamplemod.sample_'
+        result = code_assist(self.project, code, len(code), cache=cache)
+        code = 'import samplemod\nsample_var = 1\nsamplemod.sample_v'
+        narrowed = code_assist(self.project, code, len(code), cache=cache)
+        self.assertFalse(narrowed[0] in result)
+
+    def test_clearing_cached_completions_after_changing_modules(self):
+        cache = CompletionCache(self.project)
+        code = 'import samplemod\nsamplemod.sample_'
+        code_assist(self.project, code, len(code), cache=cache)
+        samplemod = self.project.get_resource('samplemod.py')
+        samplemod.write('sample_another = 1\n')
+        result = code_assist(self.project, code, len(code), cache=cache)
+        self.assertEquals(['sample_another'], [p.name for p in result])
+
+    def test_closing_completion_caches(self):
+        cache = CompletionCache(self.project)
+        cache.close()
+        self.assertFalse(cache.observer in self.project.observers)
+
+    def test_warming_up_the_modules_of_the_working_set(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('import samplemod\nfrom package import nestedmod\n')
+        module_map = self.pycore.module_cache.module_map
+        warm_up(self.project, [mod], depth=0)
+        self.assertTrue(mod in module_map)
+        self.assertFalse(self.project.get_resource('samplemod.py')
+                         in module_map)
+        warm_up(self.project, [mod])
+        self.assertTrue(self.project.get_resource('samplemod.py')
+                        in module_map)
+        self.assertTrue(self.project.get_resource('package/nestedmod.py')
+                        in module_map)
+
+    def test_not_computing_attributes_while_warming_up(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('import samplemod\n')
+        warm_up(self.project, [mod])
+        samplemod = self.project.get_resource('samplemod.py')
+        for resource in [mod, samplemod]:
+            pymodule = self.project.get_pymodule(resource)
+            self.assertEquals(None, pymodule.structural_attributes)
+
+    def test_warming_up_in_the_background(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('import samplemod\n')
+        warm = WarmUp(self.project, [mod])
+        warm.start()
+        warm.join()
+        self.assertTrue(warm.is_done())
+        self.assertTrue(self.project.get_resource('samplemod.py')
+                        in self.pycore.module_cache.module_map)
+
+    def test_forgetting_data_while_warming_up(self):
+        mods = []
+        for index in range(100):
+            mod = testutils.create_module(self.project, 'mod%d' % index)
+            mod.write('import samplemod\nvar = samplemod.sample_var\n')
+            mods.append(mod)
+        warm = WarmUp(self.project, mods)
+        warm.start()
+        while not warm.is_done():
+            self.pycore.module_cache.forget_all_data()
+        warm.join()
+        self.assertTrue(mods[-1] in self.pycore.module_cache.module_map)
+
+    def test_stopping_warm_up(self):
+        mod = testutils.create_module(self.project, 'mod')
+        warm = WarmUp(self.project, [mod])
+        warm.stop()
+        warm.start()
+        warm.join()
+        self.assertFalse(mod in self.pycore.module_cache.module_map)
+
+    def test_definition_location_of_unresolved_names_in_an_index(self):
+        index = definitions.DefinitionIndex(self.project)
+        index.generate_cache()
+        code = 'def f(obj):\n    obj.sample_method()\n'
+        result = get_definition_location(
+            self.project, code, code.index('sample_method'), index=index)
+        self.assertEquals((self.project.get_resource('samplemod.py'), 2),
+                          result)
+
     def test_simple_import(self):
         code = 'import samplemod\nsample'
         result = self._assist(code)
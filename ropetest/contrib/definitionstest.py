@@ -0,0 +1,207 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from ropetest import testutils
+from rope.contrib import definitions
+
+
+class DefinitionIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        super(DefinitionIndexTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.mod1 = testutils.create_module(self.project, 'mod1')
+        self.pkg = testutils.create_package(self.project, 'pkg')
+        self.mod2 = testutils.create_module(self.project, 'mod2', self.pkg)
+        self.index = definitions.DefinitionIndex(self.project, observe=False)
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(DefinitionIndexTest, self).tearDown()
+
+    def test_simple_case(self):
+        self.assertEquals([], self.index.find('a_func'))
+        self.assertEquals((None, None), self.index.get_location('mod1.f'))
+
+    def test_getting_definitions(self):
+        code = 'import os\nvar = 1\nvar = 2\n' \
+               'class C(object):\n    attr = 1\n' \
+               '    def method(self):\n        local = 1\n' \
+               'def f():\n    pass\n'
+        self.assertEquals(
+            [('mod.var', 2, 'variable'), ('mod.C', 4, 'class'),
+             ('mod.C.attr', 5, 'variable'), ('mod.C.method', 6, 'function'),
+             ('mod.f', 8, 'function')],
+            definitions.get_definitions(code, 'mod'))
+
+    def test_getting_locations(self):
+        self.mod2.write('class C(object):\n    def method(self):\n'
+                        '        pass\n')
+        self.index.generate_cache()
+        self.assertEquals((self.mod2, 2),
+                          self.index.get_location('pkg.mod2.C.method'))
+
+    def test_finding_definitions(self):
+        self.mod1.write('def a_func():\n    pass\n')
+        self.mod2.write('class C(object):\n    def a_func(self):\n'
+                        '        pass\n')
+        self.index.generate_cache()
+        self.assertEquals([('pkg.mod2.C.a_func', self.mod2, 2, 'function')],
+                          self.index.find('obj.C.a_func'))
+        self.assertEquals(2, len(self.index.find('obj.a_func')))
+
+    def test_getting_subclasses(self):
+        self.mod1.write('class A(object):\n    pass\n'
+                        'class B(A):\n    class C(A):\n        pass\n')
+        self.mod2.write('import mod1\nfrom mod1 import A as Base\n'
+                        'class D(mod1.A):\n    pass\n'
+                        'class E(Base, mod1.B):\n    pass\n')
+        self.index.generate_cache()
+        self.assertEquals(
+            set([('mod1.B', self.mod1), ('mod1.B.C', self.mod1),
+                 ('pkg.mod2.D', self.mod2), ('pkg.mod2.E', self.mod2)]),
+            set(self.index.get_subclasses('A')))
+        self.assertEquals([('pkg.mod2.E', self.mod2)],
+                          self.index.get_subclasses('B'))
+        self.assertEquals([], self.index.get_subclasses('Base'))
+
+    def test_getting_subclasses_of_other_base_expressions(self):
+        self.mod1.write('import mod2\nBase = mod2.A\n'
+                        'class B(Base):\n    pass\n'
+                        'class C(mod2.A[int], get_base()):\n    pass\n'
+                        'def f():\n    class D(Base):\n        pass\n')
+        self.index.generate_cache()
+        self.assertEquals(
+            [('mod1.B', self.mod1), ('mod1.C', self.mod1),
+             ('mod1.f.D', self.mod1)],
+            self.index.get_subclasses('A'))
+        self.assertEquals([('mod1.C', self.mod1)],
+                          self.index.get_classes_with_unknown_bases())
+
+    def test_not_leaking_aliases_of_class_bodies(self):
+        self.mod1.write('from mod2 import A as Base\n'
+                        'class B(object):\n    Base = object\n'
+                        'class C(Base):\n    pass\n')
+        self.index.generate_cache()
+        self.assertEquals([('mod1.C', self.mod1)],
+                          self.index.get_subclasses('A'))
+
+    def test_getting_stale_resources(self):
+        self.mod1.write('a_var = 1\n')
+        self.mod2.write('a_var = (\n')
+        self.index.generate_cache()
+        self.assertEquals([self.mod2], self.index.get_stale_resources(
+            [self.mod1, self.mod2]))
+        self.mod1.write('a_var = 2\n')
+        self.assertEquals([self.mod1], self.index.get_stale_resources(
+            [self.mod1]))
+
+    def test_getting_aliases(self):
+        self.mod1.write('from mod2 import A as Base\nB = Base\n'
+                        'def f():\n    from mod2 import A as C\n')
+        self.index.generate_cache()
+        self.assertEquals(
+            [('Base', self.mod1), ('B', self.mod1), ('C', self.mod1)],
+            self.index.get_aliases('A'))
+        self.mod1.write('B = A\n')
+        self.index.generate_cache()
+        self.assertEquals([('B', self.mod1)], self.index.get_aliases('A'))
+        self.assertEquals([], self.index.get_aliases('Base'))
+
+    def test_tracking_stale_resources_by_resource_changes(self):
+        self.mod1.write('a_var = 1\n')
+        self.index.generate_cache()
+        self.assertEquals([], self.index.get_stale_resources())
+        self.mod1.write('a_var = 2\n')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        self.assertEquals(set([self.mod1, mod3]),
+                          set(self.index.get_stale_resources()))
+        self.index.generate_cache()
+        self.assertEquals([], self.index.get_stale_resources())
+        mod3.remove()
+        self.mod1.move('mod4.py')
+        self.assertEquals([self.project.get_resource('mod4.py')],
+                          self.index.get_stale_resources())
+
+    def test_not_tracking_stale_resources_after_closing(self):
+        self.index.generate_cache()
+        self.assertEquals([], self.index.get_stale_resources())
+        self.index.close()
+        self.mod1.write('a_var = 1\n')
+        self.assertEquals([], self.index.get_stale_resources())
+
+    def test_expressions_at_offsets(self):
+        code = 'a.b(1).c . d\n'
+        self.assertEquals('c.d',
+                          definitions.get_expression_at(code, len(code) - 2))
+
+    def test_not_indexing_fresh_modules_again(self):
+        self.mod1.write('def a_func():\n    pass\n')
+        self.index.generate_cache()
+        self.index.modules['mod1'][2].append(('mod1.another', 1, 'variable'))
+        self.index.generate_cache()
+        self.assertEquals((self.mod1, 1),
+                          self.index.get_location('mod1.another'))
+
+    def test_writing_the_index(self):
+        self.mod1.write('def a_func():\n    pass\n')
+        self.index.generate_cache()
+        self.project.data_files.write()
+        index = definitions.DefinitionIndex(self.project, observe=False)
+        self.assertEquals((self.mod1, 1), index.get_location('mod1.a_func'))
+
+
+class DefinitionIndexObservingTest(unittest.TestCase):
+
+    def setUp(self):
+        super(DefinitionIndexObservingTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.mod1 = testutils.create_module(self.project, 'mod1')
+        self.index = definitions.DefinitionIndex(self.project, observe=True)
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(DefinitionIndexObservingTest, self).tearDown()
+
+    def test_writing_files(self):
+        self.mod1.write('a_var = 1\n')
+        self.assertEquals((self.mod1, 1),
+                          self.index.get_location('mod1.a_var'))
+        self.assertEquals(1, len(self.index.find('a_var')))
+
+    def test_moving_files(self):
+        self.mod1.write('a_var = 1\n')
+        self.index.find('a_var')
+        self.mod1.move('mod2.py')
+        self.assertEquals((None, None),
+                          self.index.get_location('mod1.a_var'))
+        mod2 = self.project.get_resource('mod2.py')
+        self.assertEquals([('mod2.a_var', mod2, 1, 'variable')],
+                          self.index.find('a_var'))
+
+    def test_removing_files(self):
+        self.mod1.write('a_var = 1\n')
+        self.mod1.remove()
+        self.assertEquals([], self.index.find('a_var'))
+
+    def test_updating_subclasses(self):
+        self.mod1.write('class A(object):\n    pass\n')
+        self.assertEquals([('mod1.A', self.mod1)],
+                          self.index.get_subclasses('object'))
+        self.mod1.write('class A(dict):\n    pass\n')
+        self.assertEquals([], self.index.get_subclasses('object'))
+        self.assertEquals([('mod1.A', self.mod1)],
+                          self.index.get_subclasses('dict'))
+
+
+def suite():
+    result = unittest.TestSuite()
+    result.addTests(unittest.makeSuite(DefinitionIndexTest))
+    result.addTests(unittest.makeSuite(DefinitionIndexObservingTest))
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ except ImportError:
 from rope.base import exceptions
 from rope.contrib.findit import (find_occurrences, find_implementations,
                                  find_definition)
+from rope.contrib.definitions import DefinitionIndex
 from ropetest import testutils
 
 
@@ -89,6 +90,107 @@ class FindItTest(unittest.TestCase):
         self.assertEquals(1, len(result))
         self.assertEquals(mod1.read().rindex('f('), result[0].offset)
 
+    def test_find_implementations_in_subclass_modules_of_an_index(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('class A(object):\n    def f(self):\n        pass\n')
+        mod2.write('import mod1\nclass B(mod1.A):\n    pass\n'
+                   'class C(B):\n    def f(self):\n        pass\n')
+        index = DefinitionIndex(self.project, observe=False)
+        index.generate_cache()
+        offset = mod1.read().index('f(')
+        result = find_implementations(self.project, mod1, offset,
+                                      index=index)
+        self.assertEquals([(mod2, mod2.read().rindex('f('))],
+                          [(r.resource, r.offset) for r in result])
+
+    def _assert_implementations_with_an_index(self, code, count):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('class A(object):\n    def f(self):\n        pass\n')
+        mod2.write(code)
+        index = DefinitionIndex(self.project, observe=False)
+        index.generate_cache()
+        offset = mod1.read().index('f(')
+        expected = [(r.resource, r.offset) for r in
+                    find_implementations(self.project, mod1, offset)]
+        result = find_implementations(self.project, mod1, offset,
+                                      index=index)
+        self.assertEquals(expected, [(r.resource, r.offset) for r in result])
+        self.assertEquals(count, len(result))
+
+    def test_find_implementations_of_aliased_bases_with_an_index(self):
+        self._assert_implementations_with_an_index(
+            'import mod1\nBase = mod1.A\nclass B(Base):\n'
+            '    def f(self):\n        pass\n', 1)
+
+    def test_find_implementations_of_classes_in_functions_with_an_index(self):
+        self._assert_implementations_with_an_index(
+            'import mod1\ndef g():\n    class B(mod1.A):\n'
+            '        def f(self):\n            pass\n', 1)
+
+    def test_find_implementations_of_unnamed_bases_with_an_index(self):
+        self._assert_implementations_with_an_index(
+            'import mod1\ndef get_base():\n    return mod1.A\n'
+            'class B(get_base()):\n    pass\n'
+            'class C(B):\n    def f(self):\n        pass\n', 1)
+
+    def test_find_implementations_of_bases_aliased_in_other_modules(self):
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod3.write('from mod2 import Base\nclass C(Base):\n'
+                   '    def f(self):\n        pass\n')
+        self._assert_implementations_with_an_index(
+            'from mod1 import A as Base\n', 1)
+
+    def test_find_implementations_of_bases_aliased_in_stale_modules(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod1.write('class A(object):\n    def f(self):\n        pass\n')
+        mod3.write('from mod2 import Base\nclass C(Base):\n'
+                   '    def f(self):\n        pass\n')
+        index = DefinitionIndex(self.project, observe=False)
+        index.generate_cache()
+        mod2.write('from mod1 import A as Base\n')
+        offset = mod1.read().index('f(')
+        result = find_implementations(self.project, mod1, offset,
+                                      index=index)
+        self.assertEquals([mod3], [r.resource for r in result])
+
+    def test_find_implementations_in_stale_modules_of_an_index(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('class A(object):\n    def f(self):\n        pass\n')
+        mod2.write('import mod1\nclass B(object):\n    pass\n')
+        index = DefinitionIndex(self.project, observe=False)
+        index.generate_cache()
+        mod2.write('import mod1\nclass B(mod1.A):\n'
+                   '    def f(self):\n        pass\n')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod3.write('import mod1\nclass C(mod1.A):\n'
+                   '    def f(self):\n        pass\n')
+        offset = mod1.read().index('f(')
+        result = find_implementations(self.project, mod1, offset,
+                                      index=index)
+        self.assertEquals(set([mod2, mod3]),
+                          set(r.resource for r in result))
+
+    def test_find_implementations_in_subclasses_of_stale_modules(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod1.write('class A(object):\n    def f(self):\n        pass\n')
+        mod2.write('class B(object):\n    pass\n')
+        mod3.write('import mod2\nclass C(mod2.B):\n'
+                   '    def f(self):\n        pass\n')
+        index = DefinitionIndex(self.project, observe=False)
+        index.generate_cache()
+        mod2.write('import mod1\nclass B(mod1.A):\n    pass\n')
+        offset = mod1.read().index('f(')
+        result = find_implementations(self.project, mod1, offset,
+                                      index=index)
+        self.assertEquals([mod3], [r.resource for r in result])
+
     def test_find_implementations_real_implementation_simple(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod1.write('class A(object):\n    pass\n')
@@ -113,6 +215,20 @@ class FindItTest(unittest.TestCase):
         self.assertEquals(mod1, result.resource)
         self.assertEquals(0, result.offset)
 
+    def test_find_definition_of_unresolved_names_in_an_index(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('class C(object):\n    def a_method(self):\n'
+                   '        pass\n')
+        index = DefinitionIndex(self.project)
+        index.generate_cache()
+        code = 'def f(obj):\n    obj.a_method()\n'
+        offset = code.index('a_method')
+        self.assertEquals(None, find_definition(self.project, code, offset))
+        result = find_definition(self.project, code, offset, index=index)
+        self.assertEquals(mod1, result.resource)
+        self.assertEquals(2, result.lineno)
+        self.assertEquals(mod1.read().index('a_method'), result.offset)
+
 
 def suite():
     result = unittest.TestSuite()
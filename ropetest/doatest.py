@@ -1,12 +1,13 @@
-import base64
 import hashlib
 import hmac
 import multiprocessing
+import os
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 import socket
+import struct
 try:
     import unittest2 as unittest
 except ImportError:
@@ -14,29 +15,36 @@ except ImportError:
 
 
 from rope.base.oi import doa
+from ropetest import testutils
 
 
 class DOATest(unittest.TestCase):
 
     def try_CVE_2014_3539_exploit(self, receiver, payload):
         # Simulated attacker writing to the socket
-        def attacker(data_port):
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect(('127.0.0.1', data_port))
+        def attacker(address):
+            if isinstance(address, tuple):
+                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            else:
+                s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.connect(address)
             s_file = s.makefile('wb')
             s_file.write(payload)
             s.close()
 
-        # Assume the attacker guesses the port correctly; 3037 is used by
-        # default if it is available.
+        # Assume the attacker guesses the port or the socket path correctly
+        if isinstance(receiver, doa._UnixSocketReceiver):
+            address = receiver.socket_path
+        else:
+            address = ('127.0.0.1', receiver.data_port)
         attacker_proc = multiprocessing.Process(target=attacker,
-                                                args=(receiver.data_port,))
+                                                args=(address,))
 
         attacker_proc.start()
         received_objs = list(receiver.receive_data())
         attacker_proc.join()
         return received_objs
-        
+
     def test_CVE_2014_3539_no_encoding(self):
         # Attacker sends pickled data to the receiver socket.
         receiver = doa._SocketReceiver()
@@ -51,11 +59,11 @@ class DOATest(unittest.TestCase):
         # Attacker sends well-formed data with an incorrect signature.
         receiver = doa._SocketReceiver()
 
-        pickled_data = pickle.dumps('def foo():\n    return 123\n',
+        pickled_data = pickle.dumps(['def foo():\n    return 123\n'],
                                     pickle.HIGHEST_PROTOCOL)
         digest = hmac.new(b'invalid-key', pickled_data, hashlib.sha256).digest()
-        payload = (base64.b64encode(digest) + b':' +
-                   base64.b64encode(pickled_data) + b'\n')
+        payload = (struct.pack('>I', len(pickled_data)) + digest +
+                   pickled_data)
         received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
 
         # Make sure the exploit did not run
@@ -65,16 +73,90 @@ class DOATest(unittest.TestCase):
         # Tests that sending valid, signed data on the socket does work.
         receiver = doa._SocketReceiver()
 
-        pickled_data = base64.b64encode(
-            pickle.dumps('def foo():\n    return 123\n',
-                         pickle.HIGHEST_PROTOCOL))
+        pickled_data = pickle.dumps(['def foo():\n    return 123\n'],
+                                    pickle.HIGHEST_PROTOCOL)
         digest = hmac.new(receiver.key, pickled_data, hashlib.sha256).digest()
-        payload = (base64.b64encode(digest) + b':' + pickled_data + b'\n')
+        payload = (struct.pack('>I', len(pickled_data)) + digest +
+                   pickled_data)
         received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
 
         # Make sure the exploit did not run
         self.assertEqual(1, len(received_objs))
 
+    def test_CVE_2014_3539_truncated_data(self):
+        # Attacker sends a message that is shorter than its length.
+        receiver = doa._SocketReceiver()
+
+        pickled_data = pickle.dumps(['def foo():\n    return 123\n'],
+                                    pickle.HIGHEST_PROTOCOL)
+        digest = hmac.new(receiver.key, pickled_data, hashlib.sha256).digest()
+        payload = (struct.pack('>I', len(pickled_data) + 1) + digest +
+                   pickled_data)
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        # Make sure the exploit did not run
+        self.assertEqual(0, len(received_objs))
+
+    def test_dropping_connections_sending_too_large_messages(self):
+        receiver = doa._SocketReceiver()
+
+        pickled_data = pickle.dumps([1], pickle.HIGHEST_PROTOCOL)
+        digest = hmac.new(receiver.key, pickled_data, hashlib.sha256).digest()
+        payload = (struct.pack('>I', doa._MAX_MESSAGE_SIZE + 1) + digest +
+                   struct.pack('>I', len(pickled_data)) + digest +
+                   pickled_data)
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        self.assertEqual([], received_objs)
+
+    def test_receiving_batches(self):
+        receiver = doa._SocketReceiver()
+
+        payload = b''
+        for batch in [[1, 2], [3]]:
+            pickled_data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+            digest = hmac.new(receiver.key, pickled_data,
+                              hashlib.sha256).digest()
+            payload += (struct.pack('>I', len(pickled_data)) + digest +
+                        pickled_data)
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        self.assertEqual([1, 2, 3], received_objs)
+
+    @testutils.skipNotPOSIX()
+    def test_unix_socket_signature_mismatch(self):
+        receiver = doa._UnixSocketReceiver()
+
+        pickled_data = pickle.dumps(['def foo():\n    return 123\n'],
+                                    pickle.HIGHEST_PROTOCOL)
+        digest = hmac.new(b'invalid-key', pickled_data, hashlib.sha256).digest()
+        payload = (struct.pack('>I', len(pickled_data)) + digest +
+                   pickled_data)
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        # Make sure the exploit did not run
+        self.assertEqual(0, len(received_objs))
+
+    @testutils.skipNotPOSIX()
+    def test_unix_socket_sanity(self):
+        receiver = doa._UnixSocketReceiver()
+
+        pickled_data = pickle.dumps(['def foo():\n    return 123\n'],
+                                    pickle.HIGHEST_PROTOCOL)
+        digest = hmac.new(receiver.key, pickled_data, hashlib.sha256).digest()
+        payload = (struct.pack('>I', len(pickled_data)) + digest +
+                   pickled_data)
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        self.assertEqual(1, len(received_objs))
+        self.assertFalse(os.path.exists(receiver.folder))
+
+    @testutils.skipNotPOSIX()
+    def test_closing_unix_socket_receivers_that_never_received(self):
+        receiver = doa._UnixSocketReceiver()
+        receiver.close()
+        self.assertFalse(os.path.exists(receiver.folder))
+
     def test_compare_digest_compat(self):
         self.assertTrue(doa._compat_compare_digest('', ''))
         self.assertTrue(doa._compat_compare_digest('abc', 'abc'))
@@ -76,6 +76,30 @@ class ObjectDBTest(unittest.TestCase):
         db.add_callinfo('file', 'key', (1, 2), 3)
         self.assertEquals(3, db.get_returned('file', 'key', (1, 2)))
 
+    @_do_for_all_dbs
+    def test_adding_many_callinfos(self, db):
+        db.add_callinfos('file', 'key', [((1, 2), 3), ((1, 2), -1),
+                                         ((4, 5), 6)])
+        self.assertEquals(3, db.get_returned('file', 'key', (1, 2)))
+        self.assertEquals(6, db.get_returned('file', 'key', (4, 5)))
+
+    @_do_for_all_dbs
+    def test_scope_summaries(self, db):
+        db.add_callinfo('file', 'key', (1, -1), 2)
+        summary = db.get_summary('file', 'key')
+        self.assertEquals(2, summary.returned)
+        self.assertEquals([1, -1], summary.parameters)
+        db.add_callinfo('file', 'key', (-1, 3), 4)
+        self.assertEquals(4, summary.returned)
+        self.assertEquals([1, 3], summary.parameters)
+
+    @_do_for_all_dbs
+    def test_scope_summaries_after_validating_files(self, db):
+        db.add_callinfo('invalid', 'key', (1,), 2)
+        self.assertEquals(2, db.get_summary('invalid', 'key').returned)
+        db.validate_files()
+        self.assertEquals(None, db.get_summary('invalid', 'key').returned)
+
     @_do_for_all_dbs
     def test_getting_returned_when_does_not_match(self, db):
         db.add_callinfo('file', 'key', (1, 2), 3)
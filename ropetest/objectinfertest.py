@@ -323,6 +323,35 @@ class ObjectInferTest(unittest.TestCase):
         a = mod['B'].get_object()
         self.assertEquals(a, var.get_type())
 
+    def test_transforming_textuals_after_changing_modules(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('class C(object):\n    pass\n')
+        object_info = self.project.pycore.object_info
+        textual = ('defined', 'mod.py', 'C')
+        c_class = object_info.to_pyobject(textual)
+        self.assertEquals(textual, object_info.to_textual(c_class))
+        self.assertTrue(c_class is object_info.to_pyobject(textual))
+        mod.write('class C(object):\n    a = 1\n')
+        new_class = object_info.to_pyobject(textual)
+        self.assertFalse(c_class is new_class)
+        self.assertTrue('a' in new_class)
+
+    def test_keeping_transformed_textuals_of_unchanged_modules(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('class C(object):\n    pass\n')
+        mod2.write('class D(object):\n    pass\n')
+        object_info = self.project.pycore.object_info
+        c_class = object_info.to_pyobject(('defined', 'mod1.py', 'C'))
+        d_class = object_info.to_pyobject(('defined', 'mod2.py', 'D'))
+        mod2.write('class D(object):\n    a = 1\n')
+        # only the objects of the changed module are forgotten
+        self.assertEquals(['mod1.py'], list(object_info.to_pyobject._defineds))
+        self.assertTrue(
+            c_class is object_info.to_pyobject(('defined', 'mod1.py', 'C')))
+        self.assertFalse(
+            d_class is object_info.to_pyobject(('defined', 'mod2.py', 'D')))
+
 
 def suite():
     result = unittest.TestSuite()
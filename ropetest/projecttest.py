@@ -7,6 +7,7 @@ except ImportError:
     import unittest
 
 from rope.base.exceptions import RopeError, ResourceNotFoundError
+from rope.base import fscommands
 from rope.base.fscommands import FileSystemCommands
 from rope.base.libutils import path_to_resource
 from rope.base.project import Project, NoProject, _realpath
@@ -416,6 +417,29 @@ class ProjectTest(unittest.TestCase):
         file.close()
         self.assertEquals(contents, sample_file.read().encode('latin-1'))
 
+    def test_ignoring_encoding_declarations_after_the_second_line(self):
+        sample_file = self.project.root.create_file('my_file.txt')
+        contents = b'\n\n# -*- coding: latin-1 -*-\n\xc2\xa9\n'
+        file = open(sample_file.real_path, 'wb')
+        file.write(contents)
+        file.close()
+        self.assertEquals(contents, sample_file.read().encode('utf-8'))
+
+    def test_not_searching_codings_of_sources_without_declarations(self):
+        def find_coding(text):
+            self.fail('%r was searched' % text)
+        old_find_coding = fscommands._find_coding
+        fscommands._find_coding = find_coding
+        try:
+            self.assertEquals(
+                None, fscommands.read_str_coding(b'a = 1\nb = 2\n# coding'))
+            self.assertEquals(
+                None, fscommands.read_str_coding(u'a = 1\nb = 2\n# coding'))
+        finally:
+            fscommands._find_coding = old_find_coding
+        self.assertEquals('latin-1', fscommands.read_str_coding(
+            b'\n# -*- coding: latin-1 -*-\n'))
+
     def test_read_bytes(self):
         sample_file = self.project.root.create_file('my_file.txt')
         contents = b'\n# -*- coding: latin-1 -*-\n\xa9\n'
@@ -4,6 +4,7 @@ try:
 except ImportError:
     import unittest
 
+from rope.base import ast
 from rope.base import exceptions
 from rope.base import libutils
 from rope.base.pycore import _TextChangeDetector
@@ -140,6 +141,27 @@ class PyCoreTest(unittest.TestCase):
         sample_class = mod['Sample'].get_object()
         self.assertEquals(get_base_type('Type'), sample_class.get_type())
 
+    def test_string_modules_sharing_the_ast_of_the_same_source(self):
+        code = 'class Sample(object):\n    pass\n'
+        mod1 = libutils.get_string_module(self.project, code)
+        mod2 = libutils.get_string_module(self.project, code)
+        self.assertTrue(mod1.get_ast() is mod2.get_ast())
+        self.assertNotEquals(mod1['Sample'].get_object(),
+                             mod2['Sample'].get_object())
+
+    def test_file_modules_sharing_the_ast_of_their_source(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('class Sample(object):\n    pass\n')
+        pymod = self.project.get_pymodule(mod)
+        self.assertTrue(pymod.get_ast() is
+                        ast.parse_shared(pymod.source_code))
+
+    def test_file_modules_with_byte_order_marks(self):
+        mod = testutils.create_module(self.project, 'mod')
+        with open(mod.real_path, 'wb') as output:
+            output.write(b'\xef\xbb\xbfclass Sample(object):\n    pass\n')
+        self.assertTrue('Sample' in self.project.get_pymodule(mod))
+
     def test_get_string_module_with_extra_spaces(self):
         mod = libutils.get_string_module(
             self.project, 'a = 10\n    ')  # noqa
@@ -424,6 +446,26 @@ class PyCoreTest(unittest.TestCase):
         mod.write(contents)
         self.project.get_module('mod')
 
+    def test_file_modules_with_encoding_declarations(self):
+        contents = u'# -*- coding: latin-1 -*-\n' + \
+            u's = u"\N{LATIN SMALL LETTER I WITH DIAERESIS}"\n'
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write(contents)
+        pymod = self.project.get_pymodule(mod)
+        self.assertEquals(contents, pymod.source_code)
+        self.assertEquals(2, pymod['s'].get_definition_location()[1])
+
+    def test_string_modules_with_encoding_declarations(self):
+        contents = u'# -*- coding: latin-1 -*-\n' + \
+            u's = u"\N{LATIN SMALL LETTER I WITH DIAERESIS}"\n'
+        mod = libutils.get_string_module(self.project, contents)
+        self.assertTrue('s' in mod)
+
+    def test_string_modules_with_crs_and_no_trailing_newline(self):
+        contents = 'def a_func():\r\n    pass\r\na_var = 1'
+        mod = libutils.get_string_module(self.project, contents)
+        self.assertEquals(3, mod['a_var'].get_definition_location()[1])
+
     def test_global_keyword(self):
         contents = 'a_var = 1\ndef a_func():\n    global a_var\n'
         mod = libutils.get_string_module(self.project, contents)
@@ -1059,6 +1101,18 @@ class TextChangeDetectorTest(unittest.TestCase):
         detector = _TextChangeDetector('1\n2\n', '1\n3\n')
         self.assertTrue(detector.is_changed(1, 2))
 
+    def test_changes_in_large_texts(self):
+        lines = ['%d\n' % i for i in range(10000)]
+        old = ''.join(lines)
+        new = ''.join(lines[:20] + ['x\n'] + lines[21:9000] +
+                      ['a\n', 'b\n'] + lines[9001:])
+        detector = _TextChangeDetector(old, new)
+        self.assertFalse(detector.is_changed(1, 20))
+        self.assertTrue(detector.is_changed(21, 21))
+        self.assertFalse(detector.is_changed(22, 9000))
+        self.assertTrue(detector.is_changed(9001, 9001))
+        self.assertFalse(detector.is_changed(9002, 10000))
+
     def test_consume_change(self):
         detector = _TextChangeDetector('1\n2\n', '1\n3\n')
         self.assertTrue(detector.is_changed(1, 2))
@@ -30,6 +30,13 @@ class PatchedASTTest(unittest.TestCase):
         start = source.index('10')
         checker.check_region('Num', start, start + 2)
 
+    def test_adding_sorted_children_to_an_already_patched_ast(self):
+        source = 'a = 10\n'
+        ast_frag = patchedast.get_patched_ast(source)
+        self.assertTrue(
+            ast_frag is patchedast.get_patched_ast(source, True))
+        self.assertEquals(source, patchedast.write_ast(ast_frag))
+
     def test_negative_integer_literals_and_region(self):
         source = 'a = -10\n'
         ast_frag = patchedast.get_patched_ast(source, True)
@@ -134,6 +134,14 @@ class RenameRefactoringTest(unittest.TestCase):
                                         2, 'new_var')
         self.assertEquals("new_var = 20\n# a_var\n", refactored)
 
+    def test_renaming_names_between_strings_and_comments(self):
+        code = "a_var = 20\ns = 'a_var' + a_var + \"\"\"a_var\"\"\"  # a_var\n"
+        refactored = self._local_rename(code, 2, 'new_var')
+        self.assertEquals(
+            "new_var = 20\n"
+            "s = 'a_var' + new_var + \"\"\"a_var\"\"\"  # a_var\n",
+            refactored)
+
     def test_renaming_all_occurances_in_containing_scope(self):
         code = 'if True:\n    a_var = 1\nelse:\n    a_var = 20\n'
         refactored = self._local_rename(code, 16, 'new_var')
@@ -353,6 +361,35 @@ class RenameRefactoringTest(unittest.TestCase):
             finder, 'new_var', pymodule=pymod, replace_primary=True)
         self.assertEquals('new_var = 10\nprint(1+new_var)\n', refactored)
 
+    def test_multi_finder_finding_several_names(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('a = 1\nb = a\nprint(a + b)  # a b\n')
+        pymod = self.project.get_module('mod1')
+        a_finder = rope.refactor.occurrences.create_finder(
+            self.project, 'a', pymod['a'])
+        b_finder = rope.refactor.occurrences.create_finder(
+            self.project, 'b', pymod['b'])
+        finder = rope.refactor.occurrences.MultiFinder(
+            self.project, [a_finder, b_finder])
+        result = [(occurrence.offset, occurrence.finder)
+                  for occurrence in finder.find_occurrences(mod1)]
+        self.assertEquals([(0, a_finder), (6, b_finder), (10, a_finder),
+                           (18, a_finder), (22, b_finder)], result)
+
+    def test_multi_finder_and_docs(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('a = 1\nb = a\n# a b\n')
+        pymod = self.project.get_module('mod1')
+        a_finder = rope.refactor.occurrences.create_finder(
+            self.project, 'a', pymod['a'], docs=True)
+        b_finder = rope.refactor.occurrences.create_finder(
+            self.project, 'b', pymod['b'])
+        finder = rope.refactor.occurrences.MultiFinder(
+            self.project, [a_finder, b_finder])
+        result = [occurrence.offset
+                  for occurrence in finder.find_occurrences(mod1)]
+        self.assertEquals([0, 6, 10, 14], result)
+
     def test_renaming_for_loop_variable(self):
         code = 'for var in range(10):\n    print(var)\n'
         refactored = self._local_rename(code, code.find('var') + 1, 'new_var')